@@ -0,0 +1,79 @@
+import gzip
+import zlib
+
+from flask import request
+
+from api.config import Config
+
+try:  # optional: br is only offered when the brotli package is installed
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/plain", "text/html"}
+
+
+def _choose_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def compress_response(response):
+    """
+    after_request hook: compresses large JSON/text bodies with br or gzip.
+    Streamed responses (SSE) pass through untouched so events still
+    flush one by one.
+    """
+    if (
+        response.status_code < 200
+        or response.status_code in (204, 206, 304)
+        or response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    data = response.get_data()
+    if len(data) < Config.COMPRESS_MIN_BYTES:
+        return response
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+
+    if encoding == "br":
+        # brotli quality runs 0-11, gzip levels 1-9; mid values suit both
+        body = brotli.compress(data, quality=min(11, Config.COMPRESS_LEVEL))
+    else:
+        body = gzip.compress(data, compresslevel=Config.COMPRESS_LEVEL)
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def accepts_gzip() -> bool:
+    return bool(request.accept_encodings["gzip"])
+
+
+def gzip_stream(chunks):
+    """
+    gzip a streamed body on the fly, one chunk at a time; for responses
+    compress_response leaves alone because they are streamed.
+    """
+    # wbits=31: zlib deflate wrapped in a gzip header and trailer
+    compressor = zlib.compressobj(Config.COMPRESS_LEVEL, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def init_app(app):
+    if Config.COMPRESS_ENABLED:
+        app.after_request(compress_response)
@@ -8,15 +8,151 @@ load_dotenv()
 class Config:
     # Mongo
     MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/everyday_legal_buddy")
+    # create missing indexes in the background after the first request
+    MONGO_AUTO_INDEX = os.getenv("MONGO_AUTO_INDEX", "true").lower() == "true"
 
     # JWT
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "super-secret-key")
 
+    # Password hashing
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+    BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", min(4, os.cpu_count() or 1)))
+    BCRYPT_QUEUE_MAX = int(os.getenv("BCRYPT_QUEUE_MAX", 16))
+
+    # JWT blocklist cache
+    REVOCATION_REFRESH_SECONDS = float(os.getenv("REVOCATION_REFRESH_SECONDS", 10))
+    REVOCATION_SYNC_OVERLAP_SECONDS = float(
+        os.getenv("REVOCATION_SYNC_OVERLAP_SECONDS", 60)
+    )
+
     # Groq
     GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
     GROQ_API_URL = os.getenv(
         "GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions"
     )
+    GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
+    # model routing: comma-separated models per task, preferred first;
+    # later entries are fallbacks on 429/5xx/timeouts
+    AI_SUMMARY_MODELS = os.getenv(
+        "AI_SUMMARY_MODELS", f"llama-3.1-8b-instant,{GROQ_MODEL}"
+    )
+    AI_DETAILED_MODELS = os.getenv(
+        "AI_DETAILED_MODELS", f"{GROQ_MODEL},llama-3.1-8b-instant"
+    )
+    AI_MODEL_STATS_WINDOW = int(os.getenv("AI_MODEL_STATS_WINDOW", 50))
+    AI_MODEL_COOLDOWN_SECONDS = float(os.getenv("AI_MODEL_COOLDOWN_SECONDS", 30))
+    AI_MODEL_MAX_ERROR_RATE = float(os.getenv("AI_MODEL_MAX_ERROR_RATE", 0.5))
+    # prefer a later model when its median latency is this many times lower
+    AI_MODEL_LATENCY_SLACK = float(os.getenv("AI_MODEL_LATENCY_SLACK", 2.0))
+    # client retries on a model that still has a fallback after it, before
+    # failing over (0 = fail over on the first 429/5xx/timeout)
+    AI_FALLBACK_RETRIES = int(os.getenv("AI_FALLBACK_RETRIES", 1))
+    # connection pool, quota and failure handling for the Groq API
+    GROQ_POOL_SIZE = int(os.getenv("GROQ_POOL_SIZE", 20))
+    GROQ_MAX_CONCURRENCY = int(os.getenv("GROQ_MAX_CONCURRENCY", 8))
+    GROQ_REQUESTS_PER_MINUTE = float(os.getenv("GROQ_REQUESTS_PER_MINUTE", 30))
+    GROQ_BURST = float(os.getenv("GROQ_BURST", 5))
+    GROQ_QUEUE_TIMEOUT_SECONDS = float(os.getenv("GROQ_QUEUE_TIMEOUT_SECONDS", 30))
+    GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", 3))
+    GROQ_RETRY_BASE_SECONDS = float(os.getenv("GROQ_RETRY_BASE_SECONDS", 0.5))
+    GROQ_RETRY_MAX_WAIT_SECONDS = float(os.getenv("GROQ_RETRY_MAX_WAIT_SECONDS", 20))
+    GROQ_CIRCUIT_FAILURES = int(os.getenv("GROQ_CIRCUIT_FAILURES", 5))
+    GROQ_CIRCUIT_RESET_SECONDS = float(os.getenv("GROQ_CIRCUIT_RESET_SECONDS", 30))
+    # asyncio path for background upload jobs (?async=1): their AI calls
+    # share one event loop and a non-blocking HTTP client (httpx, in
+    # requirements.txt; jobs fall back to worker threads without it).
+    # Request threads always call Groq directly.
+    ASYNC_AI_ENABLED = os.getenv("ASYNC_AI_ENABLED", "true").lower() == "true"
+    # Groq requests in flight on the loop, across every request and job
+    ASYNC_MAX_IN_FLIGHT = int(os.getenv("ASYNC_MAX_IN_FLIGHT", 256))
+    # threads for Mongo and text extraction called from coroutines
+    ASYNC_IO_WORKERS = int(os.getenv("ASYNC_IO_WORKERS", 16))
+    # threads for coroutines waiting on another instance's analysis lease
+    ASYNC_WAIT_WORKERS = int(os.getenv("ASYNC_WAIT_WORKERS", 32))
+
+    # AI analysis cache (in-process LRU + shared Mongo collection)
+    ANALYSIS_CACHE_ENABLED = (
+        os.getenv("ANALYSIS_CACHE_ENABLED", "true").lower() == "true"
+    )
+    ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", 256))
+    ANALYSIS_CACHE_TTL_SECONDS = int(
+        os.getenv("ANALYSIS_CACHE_TTL_SECONDS", 60 * 60 * 24 * 7)
+    )  # 7 days
+    # identical analyses already in flight are waited on, not re-sent;
+    # the Mongo lease extends that across instances via the cache above
+    AI_COALESCE_ENABLED = os.getenv("AI_COALESCE_ENABLED", "true").lower() == "true"
+    AI_COALESCE_MONGO_LEASE = (
+        os.getenv("AI_COALESCE_MONGO_LEASE", "false").lower() == "true"
+    )
+    AI_COALESCE_LEASE_SECONDS = float(os.getenv("AI_COALESCE_LEASE_SECONDS", 120))
+    AI_COALESCE_POLL_SECONDS = float(os.getenv("AI_COALESCE_POLL_SECONDS", 0.5))
+
+    # Chunked (map-reduce) analysis for long contracts
+    AI_CHUNKED_ENABLED = os.getenv("AI_CHUNKED_ENABLED", "true").lower() == "true"
+    AI_CHUNK_MAX_TOKENS = int(os.getenv("AI_CHUNK_MAX_TOKENS", 5000))
+    AI_MAX_CHUNKS = int(os.getenv("AI_MAX_CHUNKS", 16))
+    # chunks grow past AI_CHUNK_MAX_TOKENS (up to this) so a long contract
+    # still fits in AI_MAX_CHUNKS; beyond it the summary is marked truncated
+    AI_CHUNK_CEILING_TOKENS = int(
+        os.getenv("AI_CHUNK_CEILING_TOKENS", AI_CHUNK_MAX_TOKENS * 2)
+    )
+    # chunks of one request in flight at once
+    AI_CHUNK_CONCURRENCY = int(os.getenv("AI_CHUNK_CONCURRENCY", 4))
+    # threads shared by all requests' chunks
+    AI_CHUNK_POOL_WORKERS = int(os.getenv("AI_CHUNK_POOL_WORKERS", 16))
+    # strip headers/footers, page numbers, hyphenation and boilerplate
+    AI_NORMALIZE_TEXT = os.getenv("AI_NORMALIZE_TEXT", "true").lower() == "true"
+
+    # PDF text extraction
+    PDF_WORKERS = int(os.getenv("PDF_WORKERS", min(4, os.cpu_count() or 1)))
+    PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", 8))
+    PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", 16))
+    PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", 500))
+    PDF_TIME_BUDGET_SECONDS = float(os.getenv("PDF_TIME_BUDGET_SECONDS", 20))
+    # no point extracting more than the chunked AI analysis can send
+    PDF_CHAR_BUDGET = int(
+        os.getenv("PDF_CHAR_BUDGET", AI_MAX_CHUNKS * AI_CHUNK_MAX_TOKENS * 4)
+    )
+
+    # Extracted-text cache (lets /detailed skip re-extraction and re-upload)
+    TEXT_CACHE_MAX_BYTES = int(os.getenv("TEXT_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+    TEXT_CACHE_TTL_SECONDS = int(os.getenv("TEXT_CACHE_TTL_SECONDS", 60 * 60))
+
+    # Uploads: per-file cap enforced while reading, whole-request cap for
+    # Flask (larger bodies get 413 before any parsing)
+    MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", 25 * 1024 * 1024))
+    MAX_CONTENT_LENGTH = int(os.getenv("MAX_CONTENT_LENGTH", 100 * 1024 * 1024))
+    # uploads above this many bytes are spooled to a temp file and mmapped
+    UPLOAD_SPOOL_MAX_MEMORY = int(os.getenv("UPLOAD_SPOOL_MAX_MEMORY", 1024 * 1024))
+
+    # Metrics: Prometheus text at /metrics, optional per-request timing logs
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_REQUEST_LOG = os.getenv("METRICS_REQUEST_LOG", "false").lower() == "true"
+    # /metrics is served only when set (404 otherwise), and then requires
+    # "Authorization: Bearer <token>"
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+    # Response compression (gzip, or br when the brotli package is installed)
+    COMPRESS_ENABLED = os.getenv("COMPRESS_ENABLED", "true").lower() == "true"
+    COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", 1024))
+    COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", 6))
+
+    # Batch uploads
+    BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", 50))
+    # process-wide cap on files being extracted/analyzed for batches
+    BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", 8))
+
+    # Contract listing pagination
+    CONTRACTS_PAGE_SIZE = int(os.getenv("CONTRACTS_PAGE_SIZE", 50))
+    CONTRACTS_MAX_PAGE_SIZE = int(os.getenv("CONTRACTS_MAX_PAGE_SIZE", 200))
+
+    # NDJSON export: Mongo cursor batch and bytes buffered per written chunk
+    EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 500))
+    EXPORT_CHUNK_BYTES = int(os.getenv("EXPORT_CHUNK_BYTES", 64 * 1024))
+
+    # Background upload jobs
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", 4))
+    JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", 32))
 
     # Token expiration (seconds)
     JWT_ACCESS_EXPIRES_SECONDS = int(os.getenv("JWT_ACCESS_EXPIRES_SECONDS", 3600))
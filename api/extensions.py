@@ -1,11 +1,61 @@
+import importlib
 import os
+import threading
 
 from flask_jwt_extended import JWTManager
-from pymongo import MongoClient
 
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
 MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "legalbuddy")
 
-mongo_client = MongoClient(MONGO_URI)
-db = mongo_client[MONGO_DB_NAME]
 jwt = JWTManager()
+
+_mongo_client = None
+_mongo_lock = threading.Lock()
+
+
+def get_mongo_client():
+    # created on first use so cold starts that never touch Mongo skip it
+    global _mongo_client
+    with _mongo_lock:
+        if _mongo_client is None:
+            from pymongo import MongoClient
+
+            _mongo_client = MongoClient(MONGO_URI)
+        return _mongo_client
+
+
+def get_db():
+    return get_mongo_client()[MONGO_DB_NAME]
+
+
+def __getattr__(name):
+    # `from api.extensions import db` keeps working, resolved lazily
+    if name == "db":
+        return get_db()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class LazyObject:
+    """
+    Placeholder for `module.attr` that imports the module on first
+    attribute access. With construct=True, attr is a class that gets
+    instantiated with no arguments, e.g. a service singleton.
+    """
+
+    def __init__(self, module: str, attr: str, construct: bool = False):
+        self._module = module
+        self._attr = attr
+        self._construct = construct
+        self._obj = None
+        self._lock = threading.Lock()
+
+    def _resolve(self):
+        if self._obj is None:
+            with self._lock:
+                if self._obj is None:
+                    obj = getattr(importlib.import_module(self._module), self._attr)
+                    self._obj = obj() if self._construct else obj
+        return self._obj
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
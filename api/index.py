@@ -1,17 +1,125 @@
+import hmac
+import json
+import logging
 import os
+import threading
+import time
 from datetime import timedelta
 
-from flask import Flask, jsonify
+from flask import Flask, Response, abort, g, jsonify, request
 from flask_cors import CORS  # <-- add this
 
+from api import compression
 from api.config import Config
-from api.extensions import db, jwt
+from api.extensions import LazyObject, jwt
 from api.routes.auth_routes import auth_bp
 from api.routes.contract_routes import contract_bp
+from api.services.metrics import metrics
+from api.services.uploads import UploadRequest, format_size
+
+request_log = logging.getLogger("api.requests")
+
+revocation_cache = LazyObject("api.services.revocation_cache", "revocation_cache")
+
+
+def ensure_indexes():
+    from pymongo.errors import PyMongoError
+
+    from api.services.contract_service import ContractService
+    from api.services.user_service import UserService
+
+    for service in (UserService(), ContractService()):
+        try:
+            service.ensure_indexes()
+        except PyMongoError as e:
+            print("Could not create indexes:", e)
+
+
+_indexes_started = False
+_indexes_lock = threading.Lock()
+
+
+def _start_index_bootstrap():
+    # off the request path: index builds must never delay a response
+    global _indexes_started
+    with _indexes_lock:
+        if _indexes_started:
+            return
+        _indexes_started = True
+    threading.Thread(target=ensure_indexes, daemon=True).start()
+
+
+def _install_metrics(app):
+    if not metrics.enabled:
+        return
+    if Config.METRICS_REQUEST_LOG and not request_log.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        request_log.addHandler(handler)
+        request_log.setLevel(logging.INFO)
+
+    @app.before_request
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+        g.metrics_token = metrics.start_request()
+
+    @app.after_request
+    def record_request(response):
+        start = g.pop("metrics_start", None)
+        stages, notes = metrics.finish_request(g.pop("metrics_token", None))
+        if start is None:
+            return response
+        # streamed (SSE) bodies are timed up to the headers only
+        elapsed = time.perf_counter() - start
+        # route templates, not raw paths, keep label cardinality bounded
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        metrics.observe(
+            "legalbuddy_http_request_seconds",
+            elapsed,
+            method=request.method,
+            route=route,
+        )
+        metrics.inc(
+            "legalbuddy_http_requests_total",
+            method=request.method,
+            route=route,
+            status=response.status_code,
+        )
+        if Config.METRICS_REQUEST_LOG:
+            request_log.info(
+                json.dumps(
+                    {
+                        "method": request.method,
+                        "route": route,
+                        "status": response.status_code,
+                        "durationMs": round(elapsed * 1000, 2),
+                        "stagesMs": {
+                            k: round(v * 1000, 2) for k, v in sorted(stages.items())
+                        },
+                        **notes,
+                    }
+                )
+            )
+        return response
+
+    @app.route("/metrics")
+    def metrics_endpoint():
+        # off unless a token is configured: the metrics name routes and models
+        if not Config.METRICS_TOKEN:
+            abort(404)
+        expected = f"Bearer {Config.METRICS_TOKEN}"
+        given = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(given, expected):
+            return jsonify({"success": False, "error": "Unauthorized"}), 401
+        return Response(
+            metrics.render(), mimetype="text/plain; version=0.0.4; charset=utf-8"
+        )
 
 
 def create_app():
     app = Flask(__name__)
+    # multipart file parts are spooled (and size-capped) once, while parsing
+    app.request_class = UploadRequest
     app.config.from_object(Config)
 
     # convert expiry seconds to timedelta expected by flask-jwt-extended
@@ -32,14 +140,19 @@ def create_app():
     # init extensions
     jwt.init_app(app)
 
-    # blocklist loader uses mongo collection token_blacklist
+    if Config.MONGO_AUTO_INDEX:
+        app.before_request(_start_index_bootstrap)
+
+    # blocklist loader: cached view of mongo collection token_blacklist
     @jwt.token_in_blocklist_loader
     def check_if_token_revoked(jwt_header, jwt_payload):
         jti = jwt_payload.get("jti")
         if not jti:
             return True
-        entry = db["token_blacklist"].find_one({"jti": jti})
-        return bool(entry)
+        return revocation_cache.is_revoked(jti)
+
+    _install_metrics(app)
+    compression.init_app(app)
 
     # register blueprints
     app.register_blueprint(auth_bp, url_prefix="/auth")
@@ -54,6 +167,15 @@ def create_app():
     def not_found(e):
         return jsonify({"success": False, "error": "Not Found"}), 404
 
+    @app.errorhandler(413)
+    def too_large(e):
+        return jsonify(
+            {
+                "success": False,
+                "error": f"Request exceeds the {format_size(Config.MAX_CONTENT_LENGTH)} limit",
+            }
+        ), 413
+
     @app.errorhandler(500)
     def server_error(e):
         return jsonify({"success": False, "error": "Internal Server Error"}), 500
@@ -61,8 +183,28 @@ def create_app():
     return app
 
 
-# export app for Vercel
-app = create_app()
+_app = None
+_app_lock = threading.Lock()
+
+
+def get_app():
+    global _app
+    with _app_lock:
+        if _app is None:
+            _app = create_app()
+        return _app
+
+
+# export app for Vercel: built on first access of `api.index.app`
+def __getattr__(name):
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + ["app"])
+
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    get_app().run(debug=True)
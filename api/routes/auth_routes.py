@@ -9,10 +9,11 @@ from flask_jwt_extended import (
     jwt_required,
 )
 
-from api.services.user_service import UserService
+from api.extensions import LazyObject
+from api.services.password_hasher import HasherOverloaded
 
 auth_bp = Blueprint("auth", __name__)
-user_service = UserService()
+user_service = LazyObject("api.services.user_service", "UserService", construct=True)
 
 
 @auth_bp.route("/signup", methods=["POST"])
@@ -30,6 +31,8 @@ def signup():
         )
     except ValueError as e:
         return jsonify({"success": False, "error": str(e)}), 400
+    except HasherOverloaded as e:
+        return jsonify({"success": False, "error": str(e)}), 503
 
     access = create_access_token(identity=uid)
     refresh = create_refresh_token(identity=uid)
@@ -53,10 +56,17 @@ def login():
     if not user:
         return jsonify({"success": False, "error": "Invalid credentials"}), 401
 
-    if not user_service.verify_password(password, user["password"]):
-        return jsonify({"success": False, "error": "Invalid credentials"}), 401
+    try:
+        if not user_service.verify_password(password, user["password"]):
+            return jsonify({"success": False, "error": "Invalid credentials"}), 401
+    except HasherOverloaded as e:
+        return jsonify({"success": False, "error": str(e)}), 503
 
     uid = str(user["_id"])
+    try:
+        user_service.upgrade_password_hash(uid, password, user["password"])
+    except HasherOverloaded:
+        pass  # try again on a later login
     access = create_access_token(identity=uid)
     refresh = create_refresh_token(identity=uid)
     return jsonify(
@@ -1,61 +1,126 @@
+import datetime
+import hashlib
+import json
 import os
-from io import BytesIO
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from werkzeug.utils import secure_filename
 
-from api.services.ai_agent import AIAgent
-from api.services.contract_service import ContractService
+from api import compression
+from api.config import Config
+from api.extensions import LazyObject
+from api.services import async_runtime
+from api.services.async_runtime import offload
+from api.services.metrics import metrics
+from api.services.revision import (
+    RevisionDiff,
+    clause_fingerprints,
+    make_baseline,
+    revision_baseline,
+)
+from api.services.summary_merge import drop_risks, merge_summaries
+from api.services.text_cache import text_cache
+from api.services.uploads import UploadTooLarge, spool_upload
 
 contract_bp = Blueprint("contracts", __name__)
-cs = ContractService()
-agent = AIAgent()  # will use environment-configured GroqClient inside
+# created on first use to keep cold starts cheap
+cs = LazyObject("api.services.contract_service", "ContractService", construct=True)
+# will use environment-configured GroqClient inside
+agent = LazyObject("api.services.ai_agent", "AIAgent", construct=True)
+jobs = LazyObject("api.services.job_runner", "JobRunner", construct=True)
+
+_batch_pool = None
+_batch_pool_lock = threading.Lock()
+
+
+def _get_batch_pool():
+    # shared by all batch requests, so BATCH_CONCURRENCY is a global cap
+    global _batch_pool
+    with _batch_pool_lock:
+        if _batch_pool is None:
+            _batch_pool = ThreadPoolExecutor(
+                max_workers=Config.BATCH_CONCURRENCY, thread_name_prefix="batch"
+            )
+        return _batch_pool
 
 
 # helper: extract text from uploaded file
-def extract_text_from_file(file_storage):
+def extract_text_from_file(file_storage, owner: str = None):
     """
     Try DOCX then PDF then try decode fallback.
-    Returns a string of extracted text.
+    Returns (extracted_text, text_handle); the handle lets /detailed reuse
+    the text without a second upload while it is still cached.
     """
     filename = secure_filename(file_storage.filename or "file")
-    content = file_storage.read()
+    with spool_file(file_storage, filename) as upload:
+        return extract_text_cached(upload, filename, owner)
+
+
+def spool_file(file_storage, filename: str):
+    # read in chunks up to MAX_UPLOAD_BYTES; large files go to a temp file
+    return spool_upload(file_storage, kind=_file_kind(filename))
+
+
+def _file_kind(filename: str) -> str:
+    return os.path.splitext(filename)[1].lower()
+
+
+def extract_text_cached(upload, filename: str, owner: str = None):
+    # repeat uploads of the same file skip PDF/DOCX parsing
+    metrics.observe_size("upload", upload.size)
+    handle = upload.digest
+    text = text_cache.get(handle)
+    if text is None:
+        with metrics.timed("extract"):
+            text = extract_text_from_upload(upload, filename)
+        if text:
+            metrics.observe_size("extracted_text", len(text))
+            text_cache.put(handle, text, owner)
+    elif owner:
+        text_cache.add_owner(handle, owner)
+    return text, handle
+
+
+def extract_text_from_upload(upload, filename: str):
+    # parsers read the spooled upload in place (BytesIO or mmap), no copies
     # try docx
     try:
         from docx import Document
 
         if filename.lower().endswith(".docx"):
-            doc = Document(BytesIO(content))
+            with upload.open(mapped=False) as source:
+                doc = Document(source)
             paragraphs = [p.text for p in doc.paragraphs if p.text]
             return "\n".join(paragraphs)
-    except Exception:
-        pass
+    except Exception as e:
+        print("There was an error extracting text:", e)
 
     # try pypdf (formerly PyPDF2)
     try:
-        import pypdf
-
         if filename.lower().endswith(".pdf"):
-            reader = pypdf.PdfReader(BytesIO(content))
-            pages = []
-            for p in reader.pages:
-                try:
-                    pages.append(p.extract_text() or "")
-                except Exception:
-                    continue
-            return "\n".join(pages)
+            from api.services.pdf_extractor import extract_pdf_text
+
+            with upload.open() as source:
+                return extract_pdf_text(source, path=upload.path)
     except Exception as e:
         print("There was an error extracting text:", e)
 
     # naive utf-8 decode fallback (may fail for binaries)
     try:
-        return content.decode("utf-8")
+        return upload.decode("utf-8")
     except Exception:
         # last-resort placeholder: ask client to provide text
         return ""
 
 
+@contract_bp.errorhandler(UploadTooLarge)
+def upload_too_large(e):
+    return jsonify({"success": False, "error": str(e)}), 413
+
+
 @contract_bp.route("/upload", methods=["POST"])
 @jwt_required()
 def upload_contract():
@@ -64,7 +129,11 @@ def upload_contract():
         return jsonify({"success": False, "error": "File is required"}), 400
     file = request.files["file"]
     title = request.form.get("title") or file.filename or "Untitled Contract"
-    extracted_text = extract_text_from_file(file)
+
+    if _wants_async():
+        return _enqueue_upload(user_id, file, title)
+
+    extracted_text, text_handle = extract_text_from_file(file, owner=user_id)
     if not extracted_text:
         return jsonify(
             {
@@ -75,7 +144,7 @@ def upload_contract():
 
     # call AI summarizer
     try:
-        parsed, raw_xml = agent.summarize_contract(extracted_text, title=title)
+        parsed, raw_xml = _run_analysis(extracted_text, title)
     except RuntimeError as e:
         return jsonify(
             {"success": False, "error": "AI service unavailable", "details": str(e)}
@@ -89,25 +158,453 @@ def upload_contract():
             }
         ), 422
 
-    # Save summary only
+    # Save summary and clause fingerprints only, never the text
     doc = cs.create_contract(
-        user_id=user_id, title=title, summary=parsed, status="summarized"
+        user_id=user_id,
+        title=title,
+        summary=parsed,
+        status="summarized",
+        baseline=revision_baseline(extracted_text, parsed),
     )
+    doc.update(_handle_info(text_handle))
     return jsonify({"success": True, "data": doc}), 201
 
 
+def _run_analysis(extracted_text, title, detailed=False):
+    # request threads call Groq directly: under WSGI the thread is held
+    # either way, so only background jobs (?async=1) use the AI loop
+    analyze = agent.detailed_analysis if detailed else agent.summarize_contract
+    return analyze(extracted_text, title=title)
+
+
+def _handle_info(text_handle):
+    """
+    textHandle lets a follow-up (/detailed, /revision) skip the re-upload
+    for textHandleExpiresIn seconds. Handles are per instance: behind a
+    load balancer without sticky sessions, a follow-up may land elsewhere,
+    get "Text handle expired or unknown" and must send the file instead.
+    """
+    return {
+        "textHandle": text_handle,
+        "textHandleExpiresIn": text_cache.ttl_seconds,
+    }
+
+
+@contract_bp.route("/upload/batch", methods=["POST"])
+@jwt_required()
+def upload_contracts_batch():
+    """
+    Multipart upload of several files under "files" (optional matching
+    "titles"). Files are extracted and analyzed concurrently; successful
+    ones are saved with one insert_many. Each file gets its own result.
+    """
+    user_id = get_jwt_identity()
+    files = request.files.getlist("files")
+    if not files:
+        return jsonify(
+            {"success": False, "error": "At least one file is required"}
+        ), 400
+    if len(files) > Config.BATCH_MAX_FILES:
+        return jsonify(
+            {
+                "success": False,
+                "error": f"At most {Config.BATCH_MAX_FILES} files per batch",
+            }
+        ), 400
+    titles = request.form.getlist("titles")
+
+    items = []
+    # an oversized file fails on its own; the rest of the batch goes ahead
+    too_large = {}
+    try:
+        for i, file in enumerate(files):
+            filename = secure_filename(file.filename or "file")
+            title = (titles[i] if i < len(titles) else "") or file.filename
+            try:
+                upload = spool_file(file, filename)
+            except UploadTooLarge as e:
+                upload = None
+                too_large[i] = (None, None, None, str(e))
+            items.append((upload, filename, title or "Untitled Contract"))
+
+        pool = _get_batch_pool()
+        futures = [
+            pool.submit(_analyze_batch_item, user_id, upload, filename, title)
+            if upload is not None
+            else None
+            for upload, filename, title in items
+        ]
+        outcomes = [
+            too_large[i] if future is None else future.result()
+            for i, future in enumerate(futures)
+        ]
+    finally:
+        for upload, _, _ in items:
+            if upload is not None:
+                upload.close()
+
+    results = []
+    to_insert = []
+    for i, outcome in enumerate(outcomes):
+        _, filename, title = items[i]
+        result = {"index": i, "filename": filename, "title": title}
+        parsed, text_handle, baseline, error = outcome
+        if error:
+            result.update({"success": False, "error": error})
+        else:
+            result.update({"success": True, **_handle_info(text_handle)})
+            to_insert.append(
+                (
+                    result,
+                    {"title": title, "summary": parsed, "baseline": baseline},
+                )
+            )
+        results.append(result)
+
+    docs = cs.create_contracts(user_id, [doc for _, doc in to_insert])
+    for (result, _), doc in zip(to_insert, docs):
+        result["id"] = doc["id"]
+
+    succeeded = len(docs)
+    return jsonify(
+        {
+            "success": succeeded > 0,
+            "data": {
+                "results": results,
+                "succeeded": succeeded,
+                "failed": len(results) - succeeded,
+            },
+        }
+    ), 200
+
+
+def _analyze_batch_item(user_id, upload, filename, title):
+    # returns (parsed, text_handle, baseline, error) and never raises
+    try:
+        extracted_text, text_handle = extract_text_cached(
+            upload, filename, owner=user_id
+        )
+        if not extracted_text:
+            return None, None, None, "Could not extract text from file."
+        parsed, _ = agent.summarize_contract(extracted_text, title=title)
+        return parsed, text_handle, revision_baseline(extracted_text, parsed), None
+    except RuntimeError as e:
+        return None, None, None, f"AI service unavailable: {e}"
+    except ValueError as e:
+        return None, None, None, f"Unable to parse AI response: {e}"
+    except Exception as e:
+        return None, None, None, f"Unexpected error: {e}"
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@contract_bp.route("/upload/stream", methods=["POST"])
+@jwt_required()
+def upload_contract_stream():
+    """
+    Same as /upload but streams risks/obligations/rights/edits back as
+    Server-Sent Events while the model is still generating.
+    """
+    user_id = get_jwt_identity()
+    if "file" not in request.files:
+        return jsonify({"success": False, "error": "File is required"}), 400
+    file = request.files["file"]
+    title = request.form.get("title") or file.filename or "Untitled Contract"
+    extracted_text, text_handle = extract_text_from_file(file, owner=user_id)
+    if not extracted_text:
+        return jsonify(
+            {
+                "success": False,
+                "error": "Could not extract text from file. Please provide a text/plain upload or a docx/pdf file.",
+            }
+        ), 400
+
+    def generate():
+        parsed = None
+        try:
+            for kind, value in agent.stream_summary(extracted_text, title=title):
+                if kind == "summary":
+                    parsed = value
+                else:
+                    yield _sse(kind, value)
+        except RuntimeError as e:
+            yield _sse("error", {"error": "AI service unavailable", "details": str(e)})
+            return
+        except ValueError as e:
+            yield _sse(
+                "error", {"error": "Unable to parse AI response", "details": str(e)}
+            )
+            return
+
+        doc = cs.create_contract(
+            user_id=user_id,
+            title=title,
+            summary=parsed,
+            status="summarized",
+            baseline=revision_baseline(extracted_text, parsed),
+        )
+        doc.update(_handle_info(text_handle))
+        yield _sse("done", doc)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _wants_async():
+    flag = request.args.get("async") or request.form.get("async") or ""
+    return flag.lower() in ("1", "true", "yes")
+
+
+def _enqueue_upload(user_id, file, title):
+    # the upload stream is gone once the request ends, so spool it here;
+    # the job owns the spooled copy from then on and closes it
+    filename = secure_filename(file.filename or "file")
+    upload = spool_file(file, filename)
+    try:
+        doc = cs.create_contract(
+            user_id=user_id, title=title, summary=None, status="pending"
+        )
+    except Exception:
+        upload.close()
+        raise
+    try:
+        if async_runtime.enabled():
+            jobs.submit_coroutine(
+                _arun_upload_job, doc["id"], user_id, upload, filename, title
+            )
+        else:
+            jobs.submit(_run_upload_job, doc["id"], user_id, upload, filename, title)
+    except RuntimeError as e:
+        upload.close()
+        cs.set_status(doc["id"], "failed", error=str(e))
+        return jsonify(
+            {"success": False, "error": "Upload queue is full, retry later"}
+        ), 503
+    return jsonify(
+        {
+            "success": True,
+            "data": {
+                "jobId": doc["id"],
+                "status": "pending",
+                "statusUrl": f"/contracts/{doc['id']}/status",
+                **_handle_info(upload.digest),
+            },
+        }
+    ), 202
+
+
+def _run_upload_job(contract_id, user_id, upload, filename, title):
+    try:
+        with upload:
+            cs.set_status(contract_id, "extracting")
+            extracted_text, _ = extract_text_cached(upload, filename, owner=user_id)
+        if not extracted_text:
+            cs.set_status(
+                contract_id, "failed", error="Could not extract text from file."
+            )
+            return
+        cs.set_status(contract_id, "analyzing")
+        parsed, raw_xml = agent.summarize_contract(extracted_text, title=title)
+        cs.attach_summary_and_set_status(
+            contract_id,
+            parsed,
+            status="summarized",
+            baseline=revision_baseline(extracted_text, parsed),
+        )
+    except Exception as e:
+        cs.set_status(contract_id, "failed", error=str(e))
+
+
+async def _arun_upload_job(contract_id, user_id, upload, filename, title):
+    # _run_upload_job on the AI loop: extraction and Mongo writes go to the
+    # async I/O pool, so the loop thread only ever waits on Groq
+    try:
+        with upload:
+            await offload(cs.set_status, contract_id, "extracting")
+            extracted_text, _ = await offload(
+                extract_text_cached, upload, filename, owner=user_id
+            )
+        if not extracted_text:
+            await offload(
+                cs.set_status,
+                contract_id,
+                "failed",
+                error="Could not extract text from file.",
+            )
+            return
+        await offload(cs.set_status, contract_id, "analyzing")
+        parsed, raw_xml = await agent.asummarize_contract(extracted_text, title=title)
+        baseline = await offload(revision_baseline, extracted_text, parsed)
+        await offload(
+            cs.attach_summary_and_set_status,
+            contract_id,
+            parsed,
+            status="summarized",
+            baseline=baseline,
+        )
+    except Exception as e:
+        await offload(cs.set_status, contract_id, "failed", error=str(e))
+
+
+def _parse_iso(value):
+    try:
+        parsed = datetime.datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed.replace(tzinfo=datetime.timezone.utc, microsecond=0)
+
+
+def _not_modified(etag: str, updated_at):
+    """
+    304 response when the client's If-None-Match / If-Modified-Since copy
+    is current, else None. ETags are weak: gzip/br bodies stay equivalent.
+    """
+    if request.if_none_match:
+        fresh = request.if_none_match.contains_weak(etag)
+    else:
+        last_modified = _parse_iso(updated_at)
+        since = request.if_modified_since
+        fresh = bool(last_modified and since and last_modified <= since)
+    if not fresh:
+        return None
+    return _with_validators(Response(status=304), etag, updated_at)
+
+
+def _with_validators(response, etag: str, updated_at):
+    response.set_etag(etag, weak=True)
+    last_modified = _parse_iso(updated_at)
+    if last_modified:
+        response.last_modified = last_modified
+    # private: per-user data; no-cache: always revalidate (cheap 304s)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
 @contract_bp.route("", methods=["GET"])
 @jwt_required()
 def list_contracts():
     user_id = get_jwt_identity()
-    items = cs.list_by_user(user_id)
-    return jsonify({"success": True, "data": items}), 200
+    try:
+        items, next_cursor = cs.list_by_user(
+            user_id,
+            limit=request.args.get("limit", type=int),
+            cursor=request.args.get("cursor"),
+        )
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    # the page's identity is its ids and their versions (covers edits,
+    # uploads and deletes), so serialization is skipped when unchanged
+    digest = hashlib.sha1()
+    for item in items:
+        digest.update(f"{item['id']}:{item['version']};".encode("ascii"))
+    digest.update((next_cursor or "").encode("ascii"))
+    etag = digest.hexdigest()
+    # no Last-Modified: a page's newest updatedAt can go back in time when a
+    # delete pulls an older contract into it, so only the ETag is reliable
+    not_modified = _not_modified(etag, None)
+    if not_modified is not None:
+        return not_modified
+    response = jsonify({"success": True, "data": items, "nextCursor": next_cursor})
+    return _with_validators(response, etag, None), 200
+
+
+@contract_bp.route("/search", methods=["GET"])
+@jwt_required()
+def search_contracts():
+    """
+    GET /contracts/search?q=auto-renew&minSeverity=high&limit=20&offset=0
+    At least one of q and minSeverity is required.
+    """
+    user_id = get_jwt_identity()
+    query = (request.args.get("q") or "").strip()
+    min_severity = request.args.get("minSeverity")
+    if not query and not min_severity:
+        return jsonify(
+            {"success": False, "error": "Provide a search query (q) or minSeverity"}
+        ), 400
+    try:
+        items, next_offset = cs.search(
+            user_id,
+            query=query or None,
+            min_severity=min_severity,
+            limit=request.args.get("limit", type=int),
+            offset=request.args.get("offset", type=int),
+        )
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    return jsonify({"success": True, "data": items, "nextOffset": next_offset}), 200
+
+
+@contract_bp.route("/export", methods=["GET"])
+@jwt_required()
+def export_contracts():
+    """
+    GET /contracts/export?since=2024-05-01T00:00:00
+    Every contract as one JSON object per line (NDJSON), oldest first,
+    streamed from the cursor; gzipped on the fly when the client accepts it.
+    For incremental exports pass the last uploadDate received as since.
+    """
+    user_id = get_jwt_identity()
+    try:
+        docs = cs.export_by_user(user_id, since=request.args.get("since"))
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    body = _ndjson_chunks(docs)
+    headers = {"Cache-Control": "no-store", "X-Accel-Buffering": "no"}
+    if compression.accepts_gzip():
+        body = compression.gzip_stream(body)
+        headers.update({"Content-Encoding": "gzip", "Vary": "Accept-Encoding"})
+    return Response(
+        stream_with_context(body), mimetype="application/x-ndjson", headers=headers
+    )
+
+
+def _ndjson_chunks(docs):
+    # lines are buffered into EXPORT_CHUNK_BYTES writes, not sent one by one
+    buffer, size = [], 0
+    for doc in docs:
+        line = json.dumps(doc, default=str, separators=(",", ":")) + "\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= Config.EXPORT_CHUNK_BYTES:
+            yield "".join(buffer).encode("utf-8")
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+@contract_bp.route("/models/stats", methods=["GET"])
+@jwt_required()
+def model_stats():
+    return jsonify({"success": True, "data": agent.model_stats()}), 200
+
+
+@contract_bp.route("/cache/stats", methods=["GET"])
+@jwt_required()
+def cache_stats():
+    return jsonify({"success": True, "data": agent.cache_stats()}), 200
 
 
 @contract_bp.route("/<string:contract_id>", methods=["GET"])
 @jwt_required()
 def get_contract(contract_id):
     user_id = get_jwt_identity()
+    # check freshness on a tiny projection before loading the summary
+    meta = cs.get_version(contract_id, user_id)
+    if not meta:
+        return jsonify({"success": False, "error": "Not found"}), 404
+    etag = f"{meta['_id']}-{meta.get('version', 0)}"
+    updated_at = meta.get("updatedAt") or meta.get("uploadDate")
+    not_modified = _not_modified(etag, updated_at)
+    if not_modified is not None:
+        return not_modified
+
     c = cs.get_by_id_and_user(contract_id, user_id)
     if not c:
         return jsonify({"success": False, "error": "Not found"}), 404
@@ -116,8 +613,27 @@ def get_contract(contract_id):
         "title": c.get("title"),
         "status": c.get("status"),
         "uploadDate": c.get("uploadDate"),
+        "updatedAt": c.get("updatedAt") or c.get("uploadDate"),
+        "version": c.get("version", 0),
         "summary": c.get("summary"),
     }
+    # the etag follows the document actually served (it may have changed)
+    response = jsonify({"success": True, "data": out})
+    return _with_validators(
+        response, f"{c['_id']}-{out['version']}", out["updatedAt"]
+    ), 200
+
+
+@contract_bp.route("/<string:contract_id>/status", methods=["GET"])
+@jwt_required()
+def contract_status(contract_id):
+    user_id = get_jwt_identity()
+    c = cs.get_status(contract_id, user_id)
+    if not c:
+        return jsonify({"success": False, "error": "Not found"}), 404
+    out = {"id": str(c["_id"]), "status": c.get("status")}
+    if c.get("error"):
+        out["error"] = c["error"]
     return jsonify({"success": True, "data": out}), 200
 
 
@@ -144,6 +660,51 @@ def delete_contract(contract_id):
     return jsonify({"success": True, "data": {"deletedCount": deleted}}), 200
 
 
+def _request_text(user_id, purpose: str):
+    """
+    Contract text for a follow-up analysis, as (text, None) or
+    (None, error_response). We never store raw text: either re-upload the
+    file, or pass the textHandle from a recent upload while its text is
+    still cached.
+    """
+    if "file" in request.files:
+        extracted_text, _ = extract_text_from_file(request.files["file"], user_id)
+        if not extracted_text:
+            return None, (
+                jsonify(
+                    {"success": False, "error": "Could not extract text from file."}
+                ),
+                400,
+            )
+        return extracted_text, None
+
+    handle = request.form.get("textHandle") or (
+        request.get_json(silent=True) or {}
+    ).get("textHandle")
+    if not handle:
+        return None, (
+            jsonify(
+                {
+                    "success": False,
+                    "error": f"File (docx/pdf) required for {purpose}. Re-upload the contract file.",
+                }
+            ),
+            400,
+        )
+    extracted_text = text_cache.get(handle, owner=user_id)
+    if not extracted_text:
+        return None, (
+            jsonify(
+                {
+                    "success": False,
+                    "error": "Text handle expired or unknown. Re-upload the contract file.",
+                }
+            ),
+            400,
+        )
+    return extracted_text, None
+
+
 @contract_bp.route("/<string:contract_id>/detailed", methods=["POST"])
 @jwt_required()
 def detailed_analysis(contract_id):
@@ -152,25 +713,91 @@ def detailed_analysis(contract_id):
     if not c:
         return jsonify({"success": False, "error": "Not found"}), 404
 
-    # require file to be uploaded again for detailed analysis (we never store raw)
-    if "file" not in request.files:
+    title = c.get("title")
+    extracted_text, error = _request_text(user_id, "detailed analysis")
+    if error:
+        return error
+
+    try:
+        parsed, raw_xml = _run_analysis(extracted_text, title, detailed=True)
+    except RuntimeError as e:
+        return jsonify(
+            {"success": False, "error": "AI service unavailable", "details": str(e)}
+        ), 503
+    except ValueError as e:
         return jsonify(
             {
                 "success": False,
-                "error": "File (docx/pdf) required for detailed analysis. Re-upload the contract file.",
+                "error": "Unable to parse AI response",
+                "details": str(e),
             }
-        ), 400
+        ), 422
+
+    updated = cs.attach_summary_and_set_status(
+        contract_id,
+        parsed,
+        status="detailed",
+        baseline=revision_baseline(extracted_text, parsed),
+    )
+    out = {
+        "id": str(updated["_id"]),
+        "title": updated.get("title"),
+        "status": updated.get("status"),
+        "uploadDate": updated.get("uploadDate"),
+        "summary": updated.get("summary"),
+    }
+    return jsonify({"success": True, "data": out}), 200
 
-    file = request.files["file"]
-    title = c.get("title")
-    extracted_text = extract_text_from_file(file)
-    if not extracted_text:
-        return jsonify(
-            {"success": False, "error": "Could not extract text from file."}
-        ), 400
 
+@contract_bp.route("/<string:contract_id>/revision", methods=["POST"])
+@jwt_required()
+def revise_contract(contract_id):
+    """
+    Re-analyze a new version (file or textHandle) of an existing contract.
+    Its clauses are fingerprinted and diffed against the fingerprints of
+    the previous version; only changed and new clauses go to the model.
+    Previous findings whose source clauses changed or were removed are
+    dropped, and the revision's findings replace same-titled ones, so a
+    redline can lower or clear a risk.
+    """
+    user_id = get_jwt_identity()
+    c = cs.get_by_id_and_user(contract_id, user_id)
+    if not c:
+        return jsonify({"success": False, "error": "Not found"}), 404
+
+    extracted_text, error = _request_text(user_id, "a revision")
+    if error:
+        return error
+
+    title = c.get("title")
+    clauses, fingerprints = clause_fingerprints(extracted_text)
+    previous = c.get("summary")
     try:
-        parsed, raw_xml = agent.detailed_analysis(extracted_text, title=title)
+        if not c.get("clauseFingerprints") or not previous:
+            # no baseline to diff against (older upload): analyze it all
+            summary, _ = agent.summarize_contract(extracted_text, title=title)
+            stats = RevisionDiff([], clauses, fingerprints).stats()
+            stats["mode"] = "full"
+        else:
+            diff = RevisionDiff(c["clauseFingerprints"], clauses, fingerprints)
+            touched = diff.touched_clauses()
+            # the touched clauses' analysis re-reports whatever still applies
+            stale = diff.stale_findings(previous, c.get("findingSources"))
+            summary = drop_risks(previous, stale)
+            if touched:
+                parsed, _ = agent.analyze_revision(touched, title=title)
+                summary = merge_summaries(
+                    [summary, parsed],
+                    title=previous.get("title") or title,
+                    prefer_later=True,
+                )
+            elif stale:
+                summary = merge_summaries(
+                    [summary], title=previous.get("title") or title
+                )
+            stats = diff.stats()
+            stats["mode"] = "incremental"
+            stats["droppedFindings"] = len(stale)
     except RuntimeError as e:
         return jsonify(
             {"success": False, "error": "AI service unavailable", "details": str(e)}
@@ -184,12 +811,19 @@ def detailed_analysis(contract_id):
             }
         ), 422
 
-    updated = cs.attach_summary_and_set_status(contract_id, parsed, status="detailed")
+    updated = cs.attach_summary_and_set_status(
+        contract_id,
+        summary,
+        status="revised",
+        baseline=make_baseline(clauses, fingerprints, summary),
+        revision=stats,
+    )
     out = {
         "id": str(updated["_id"]),
         "title": updated.get("title"),
         "status": updated.get("status"),
         "uploadDate": updated.get("uploadDate"),
         "summary": updated.get("summary"),
+        "revision": stats,
     }
     return jsonify({"success": True, "data": out}), 200
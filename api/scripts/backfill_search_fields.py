@@ -0,0 +1,24 @@
+"""
+One-off migration: sets maxSeverityRank (used by severity search) on
+contracts saved before the field existed. Safe to re-run; it only touches
+contracts still missing the field.
+Run: python -m api.scripts.backfill_search_fields [--batch-size 500]
+"""
+
+import argparse
+import time
+
+from api.services.contract_service import ContractService
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--batch-size", type=int, default=500)
+    args = ap.parse_args()
+    start = time.perf_counter()
+    updated = ContractService().backfill_search_fields(batch_size=args.batch_size)
+    print(f"Backfilled {updated} contracts in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Concurrent-upload throughput of background jobs on worker threads
+against jobs on the asyncio path (Groq calls on the shared AI loop), with
+plain synchronous uploads as the baseline, and the app behind a
+fixed-size WSGI thread pool like a gthread worker.
+The "in flight" column is the most Groq calls the app had open at once.
+Modes:
+  sync     POST /contracts/upload, AI call blocks the request thread
+  threads  POST /contracts/upload?async=1, jobs on JOB_WORKERS threads
+  jobs     POST /contracts/upload?async=1, jobs awaited on the AI loop
+The job modes are timed until every job is done (their latency columns
+are the time to the 202 response).
+Groq is the local fake (api.scripts.fake_groq).
+Run: python -m api.scripts.bench_async --in-memory [--workers 8]
+     [--concurrency 64] [--uploads 4] [--groq-latency-ms 800]
+     [--modes sync,threads,jobs]
+"""
+
+import argparse
+import io
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from api.scripts.bench_auth_login import use_in_memory_mongo
+from api.scripts.bench_load import Recorder
+from api.scripts.fake_groq import FakeGroqServer
+from api.scripts.make_contracts import make_contract
+
+
+def serve(app, workers: int):
+    """Serve app on an ephemeral port with at most `workers` handler threads."""
+    from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    class PooledWSGIServer(socketserver.ThreadingMixIn, BaseWSGIServer):
+        daemon_threads = True
+        request_queue_size = 1024
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.pool = ThreadPoolExecutor(max_workers=workers)
+
+        def process_request(self, request, client_address):
+            self.pool.submit(self.process_request_thread, request, client_address)
+
+    server = PooledWSGIServer("127.0.0.1", 0, app, handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def login(base_url):
+    import requests
+
+    session = requests.Session()
+    creds = {"email": f"async-{uuid.uuid4().hex[:12]}@example.com", "password": "pw"}
+    session.post(base_url + "/auth/signup", json=creds, timeout=60)
+    resp = session.post(base_url + "/auth/login", json=creds, timeout=60)
+    session.headers["Authorization"] = f"Bearer {resp.json()['data']['accessToken']}"
+    return session
+
+
+def client_loop(session, base_url, mode, recorder: Recorder, args, index, job_urls):
+    import requests
+
+    query = "" if mode == "sync" else "?async=1"
+    for i in range(args.uploads):
+        # unique text per upload: cache hits would skip the Groq call
+        filename, content = make_contract("txt", args.chars, index * 100 + i)
+        start = time.perf_counter()
+        try:
+            resp = session.post(
+                f"{base_url}/contracts/upload{query}",
+                files={"file": (filename, io.BytesIO(content))},
+                timeout=300,
+            )
+            status = resp.status_code
+            if status == 202:
+                job_urls.append((session, base_url + resp.json()["data"]["statusUrl"]))
+        except requests.RequestException:
+            status = 0
+        recorder.record(mode, time.perf_counter() - start, status)
+
+
+def run_mode(mode: str, base_url: str, sessions: list, fake, args) -> dict:
+    from api.config import Config
+    from api.routes.contract_routes import jobs
+
+    Config.ASYNC_AI_ENABLED = mode == "jobs"
+    recorder = Recorder()
+    job_urls = []
+    # a different contract seed range per mode keeps every upload unique
+    seed = (args.modes.split(",").index(mode) + 1) * 100000
+    threads = [
+        threading.Thread(
+            target=client_loop,
+            args=(session, base_url, mode, recorder, args, seed + i, job_urls),
+        )
+        for i, session in enumerate(sessions)
+    ]
+    fake.peak_in_flight = 0
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # job modes: the clock runs until every analysis has finished; the
+    # bench shares the app's process, so it can watch the runner directly
+    while jobs.in_flight():
+        time.sleep(0.01)
+    report = recorder.report(time.perf_counter() - start)["ops"].get(mode)
+    report["groqPeakInFlight"] = fake.peak_in_flight
+    if job_urls:
+        statuses = [session.get(url, timeout=60).json() for session, url in job_urls]
+        report["errors"] += sum(
+            1 for s in statuses if s.get("data", {}).get("status") != "summarized"
+        )
+    return report
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--modes", default="sync,threads,jobs")
+    ap.add_argument("--workers", type=int, default=8, help="WSGI handler threads")
+    ap.add_argument("--concurrency", type=int, default=64, help="concurrent clients")
+    ap.add_argument("--uploads", type=int, default=4, help="uploads per client")
+    ap.add_argument("--chars", type=int, default=4000, help="contract characters")
+    ap.add_argument("--groq-latency-ms", type=float, default=800)
+    ap.add_argument("--groq-jitter-ms", type=float, default=100)
+    ap.add_argument("--in-memory", action="store_true", help="use mongomock")
+    ap.add_argument("--json", help="write the report here")
+    args = ap.parse_args()
+
+    fake = FakeGroqServer(
+        ("127.0.0.1", 0),
+        latency_ms=args.groq_latency_ms,
+        jitter_ms=args.groq_jitter_ms,
+    )
+    fake.start_background()
+    # Config reads the environment at import time
+    os.environ["GROQ_API_URL"] = fake.url
+    os.environ.setdefault("GROQ_API_KEY", "bench")
+    # the local fake has no quota; lift the client-side limiter
+    os.environ.setdefault("GROQ_REQUESTS_PER_MINUTE", "1000000")
+    os.environ.setdefault("GROQ_BURST", "1000000")
+    os.environ.setdefault("ANALYSIS_CACHE_ENABLED", "false")
+    if args.in_memory:
+        use_in_memory_mongo()
+
+    from api.config import Config
+    from api.index import create_app
+    from api.services import async_runtime
+
+    Config.ASYNC_AI_ENABLED = True
+    if not async_runtime.enabled():
+        sys.exit("the asyncio path needs httpx: pip install httpx")
+    server, base_url = serve(create_app(), args.workers)
+
+    print(
+        f"{args.workers} WSGI threads, {args.concurrency} clients x {args.uploads}"
+        f" uploads, Groq latency {args.groq_latency_ms:.0f}ms,"
+        f" GROQ_MAX_CONCURRENCY={Config.GROQ_MAX_CONCURRENCY},"
+        f" ASYNC_MAX_IN_FLIGHT={Config.ASYNC_MAX_IN_FLIGHT}"
+    )
+    print(
+        f"{'mode':<8}{'count':>7}{'errors':>8}{'p50 ms':>10}"
+        f"{'p95 ms':>10}{'p99 ms':>10}{'uploads/s':>11}{'in flight':>11}"
+    )
+    # sign-ups (bcrypt) happen before any timing starts
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        sessions = list(pool.map(login, [base_url] * args.concurrency))
+    report = {}
+    for mode in args.modes.split(","):
+        r = run_mode(mode, base_url, sessions, fake, args)
+        report[mode] = r
+        print(
+            f"{mode:<8}{r['count']:>7}{r['errors']:>8}{r['p50_ms']:>10.1f}"
+            f"{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}{r['rps']:>11.1f}"
+            f"{r['groqPeakInFlight']:>11}"
+        )
+    report["groq"] = {"requests": fake.requests}
+    server.shutdown()
+    fake.shutdown()
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Micro-benchmark: /auth/login throughput at different bcrypt costs.
+Run: python -m api.scripts.bench_auth_login [--costs 4,8,10,12] [--concurrency 16]
+Add --in-memory to use mongomock (pip install mongomock) instead of MONGO_URI.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+
+def use_in_memory_mongo():
+    try:
+        import mongomock
+    except ImportError:
+        sys.exit("--in-memory needs mongomock: pip install mongomock")
+    import pymongo
+
+    pymongo.MongoClient = mongomock.MongoClient
+
+
+def run_cost(client, password_hasher, cost: int, concurrency: int, logins: int):
+    password_hasher.rounds = cost
+    email = f"bench-{cost}-{time.time_ns()}@example.com"
+    r = client.post("/auth/signup", json={"email": email, "password": "bench-pass"})
+    if r.status_code != 201:
+        sys.exit(f"signup failed: {r.status_code} {r.get_json()}")
+
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    per_thread = max(1, logins // concurrency)
+
+    def worker():
+        for _ in range(per_thread):
+            start = time.perf_counter()
+            resp = client.post(
+                "/auth/login", json={"email": email, "password": "bench-pass"}
+            )
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    ok = statuses.get(200, 0)
+    return {
+        "cost": cost,
+        "ok_per_sec": ok / wall,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "statuses": statuses,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--costs", default="4,8,10,12")
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--logins", type=int, default=128)
+    ap.add_argument("--in-memory", action="store_true")
+    args = ap.parse_args()
+
+    if args.in_memory:
+        use_in_memory_mongo()
+    os.environ.setdefault("GROQ_API_KEY", "bench")
+
+    from api.index import create_app
+    from api.services.password_hasher import password_hasher
+
+    app = create_app()
+    client = app.test_client()
+
+    print(f"{'cost':>5}{'logins/s':>10}{'p50 ms':>10}{'p95 ms':>10}  statuses")
+    for cost in (int(c) for c in args.costs.split(",")):
+        r = run_cost(client, password_hasher, cost, args.concurrency, args.logins)
+        print(
+            f"{r['cost']:>5}{r['ok_per_sec']:>10.1f}{r['p50_ms']:>10.1f}"
+            f"{r['p95_ms']:>10.1f}  {r['statuses']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark: serverless-style cold start, i.e. a fresh interpreter importing
+api.index and serving its first response for "/".
+Run: python -m api.scripts.bench_cold_start [--runs 10]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# runs in a fresh interpreter per sample
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import api.index
+t1 = time.perf_counter()
+app = api.index.app
+t2 = time.perf_counter()
+resp = app.test_client().get("/")
+t3 = time.perf_counter()
+heavy = [m for m in ("pymongo", "requests", "pypdf", "docx") if m in sys.modules]
+print(json.dumps({
+    "status": resp.status_code,
+    "import_ms": (t1 - t0) * 1000,
+    "create_app_ms": (t2 - t1) * 1000,
+    "first_response_ms": (t3 - t2) * 1000,
+    "heavy_modules": heavy,
+}))
+"""
+
+
+def sample(env: dict) -> dict:
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    # includes interpreter startup, like a real cold start
+    result["process_ms"] = (time.perf_counter() - start) * 1000
+    return result
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=10)
+    args = ap.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("GROQ_API_KEY", "bench")
+
+    sample(env)  # warm the bytecode cache like a deployed bundle
+    samples = [sample(env) for _ in range(args.runs)]
+
+    for key in ("import_ms", "create_app_ms", "first_response_ms", "process_ms"):
+        values = [s[key] for s in samples]
+        print(
+            f"{key:<20} median {statistics.median(values):8.1f}"
+            f"   min {min(values):8.1f}   max {max(values):8.1f}"
+        )
+    print("heavy modules loaded by '/':", samples[-1]["heavy_modules"] or "none")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+End-to-end load benchmark: virtual users sign up, log in, then upload,
+list and request detailed analysis concurrently. Groq is replaced by the
+local fake (api.scripts.fake_groq) so no quota is spent.
+Run: python -m api.scripts.bench_load --in-memory [--users 16] [--iterations 5]
+     [--groq-latency-ms 800] [--groq-error-rate 0.02] [--kinds txt,pdf,docx]
+Against a running server (pointed at a fake Groq itself):
+     python -m api.scripts.bench_load --base-url http://127.0.0.1:5000
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+
+from api.scripts.bench_auth_login import use_in_memory_mongo
+from api.scripts.fake_groq import FakeGroqServer
+from api.scripts.make_contracts import make_contract
+
+
+def percentile(sorted_values, p: float) -> float:
+    # nearest-rank on an already sorted list
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(p / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {}  # op -> [(seconds, status)]
+        self._lock = threading.Lock()
+
+    def record(self, op: str, seconds: float, status: int):
+        with self._lock:
+            self.samples.setdefault(op, []).append((seconds, status))
+
+    def report(self, wall: float) -> dict:
+        out = {"wallSeconds": wall, "ops": {}}
+        total = 0
+        for op, samples in sorted(self.samples.items()):
+            latencies = sorted(s for s, _ in samples)
+            errors = sum(1 for _, status in samples if status >= 400 or status == 0)
+            total += len(samples)
+            out["ops"][op] = {
+                "count": len(samples),
+                "errors": errors,
+                "p50_ms": percentile(latencies, 50) * 1000,
+                "p95_ms": percentile(latencies, 95) * 1000,
+                "p99_ms": percentile(latencies, 99) * 1000,
+                "rps": len(samples) / wall if wall else 0.0,
+            }
+        out["requests"] = total
+        out["rps"] = total / wall if wall else 0.0
+        return out
+
+
+class FlaskTarget:
+    # in-process: exercises the whole app without a socket
+    def __init__(self):
+        from api.index import create_app
+
+        self.client = create_app().test_client()
+
+    def request(self, method, path, headers=None, json_body=None, files=None):
+        kwargs = {"headers": headers or {}}
+        if files:
+            kwargs["data"] = files
+            kwargs["content_type"] = "multipart/form-data"
+        elif json_body is not None:
+            kwargs["json"] = json_body
+        resp = self.client.open(path, method=method, **kwargs)
+        return resp.status_code, resp.get_json(silent=True) or {}
+
+
+class HttpTarget:
+    def __init__(self, base_url: str):
+        import requests
+
+        self.base_url = base_url.rstrip("/")
+        self.local = threading.local()
+        self._requests = requests
+
+    def _session(self):
+        if not hasattr(self.local, "session"):
+            self.local.session = self._requests.Session()
+        return self.local.session
+
+    def request(self, method, path, headers=None, json_body=None, files=None):
+        if files:
+            files = {
+                k: (v[1], v[0].getvalue()) if isinstance(v, tuple) else (None, v)
+                for k, v in files.items()
+            }
+        try:
+            resp = self._session().request(
+                method,
+                self.base_url + path,
+                headers=headers,
+                json=json_body,
+                files=files,
+                timeout=300,
+            )
+        except self._requests.RequestException:
+            return 0, {}
+        try:
+            return resp.status_code, resp.json()
+        except ValueError:
+            return resp.status_code, {}
+
+
+def virtual_user(target, recorder: Recorder, args, user_index: int):
+    def call(op, method, path, **kwargs):
+        start = time.perf_counter()
+        status, body = target.request(method, path, **kwargs)
+        recorder.record(op, time.perf_counter() - start, status)
+        return status, body
+
+    email = f"load-{uuid.uuid4().hex[:12]}@example.com"
+    creds = {"email": email, "password": "load-pass"}
+    status, _ = call("signup", "POST", "/auth/signup", json_body=creds)
+    if status != 201:
+        return
+    status, body = call("login", "POST", "/auth/login", json_body=creds)
+    if status != 200:
+        return
+    headers = {"Authorization": f"Bearer {body['data']['accessToken']}"}
+
+    kinds = args.kinds.split(",")
+    sizes = [int(s) for s in args.sizes.split(",")]
+    for i in range(args.iterations):
+        seed = user_index * 100000 + i
+        kind = kinds[seed % len(kinds)]
+        filename, content = make_contract(kind, sizes[seed % len(sizes)], seed)
+        status, body = call(
+            f"upload[{kind}]",
+            "POST",
+            "/contracts/upload",
+            headers=headers,
+            files={"file": (io.BytesIO(content), filename), "title": filename},
+        )
+        call("list", "GET", "/contracts", headers=headers)
+        if status != 201 or not args.detailed_every:
+            continue
+        if (i + 1) % args.detailed_every == 0:
+            data = body["data"]
+            call(
+                "detailed",
+                "POST",
+                f"/contracts/{data['id']}/detailed",
+                headers=headers,
+                json_body={"textHandle": data.get("textHandle")},
+            )
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=16, help="concurrent virtual users")
+    ap.add_argument("--iterations", type=int, default=5, help="uploads per user")
+    ap.add_argument("--detailed-every", type=int, default=2)
+    ap.add_argument("--kinds", default="txt,pdf,docx")
+    ap.add_argument("--sizes", default="4000,40000", help="contract characters")
+    ap.add_argument("--groq-latency-ms", type=float, default=800)
+    ap.add_argument("--groq-jitter-ms", type=float, default=200)
+    ap.add_argument("--groq-error-rate", type=float, default=0.0)
+    ap.add_argument("--base-url", help="benchmark a running server over HTTP")
+    ap.add_argument("--in-memory", action="store_true", help="use mongomock")
+    ap.add_argument("--json", help="write the report here")
+    args = ap.parse_args()
+
+    fake = None
+    if args.base_url:
+        target = HttpTarget(args.base_url)
+    else:
+        fake = FakeGroqServer(
+            ("127.0.0.1", 0),
+            latency_ms=args.groq_latency_ms,
+            jitter_ms=args.groq_jitter_ms,
+            error_rate=args.groq_error_rate,
+        )
+        fake.start_background()
+        # Config reads the environment at import time
+        os.environ["GROQ_API_URL"] = fake.url
+        os.environ.setdefault("GROQ_API_KEY", "bench")
+        # the local fake has no quota; lift the client-side limiter
+        os.environ.setdefault("GROQ_REQUESTS_PER_MINUTE", "1000000")
+        os.environ.setdefault("GROQ_BURST", "1000000")
+        if args.in_memory:
+            use_in_memory_mongo()
+        target = FlaskTarget()
+
+    recorder = Recorder()
+    threads = [
+        threading.Thread(target=virtual_user, args=(target, recorder, args, i))
+        for i in range(args.users)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    report = recorder.report(time.perf_counter() - start)
+    if fake is not None:
+        report["groq"] = {"requests": fake.requests, "injectedErrors": fake.errors}
+        fake.shutdown()
+
+    if not report["ops"]:
+        sys.exit("no requests completed")
+    print(
+        f"{'op':<16}{'count':>7}{'errors':>8}{'p50 ms':>10}"
+        f"{'p95 ms':>10}{'p99 ms':>10}{'req/s':>9}"
+    )
+    for op, r in report["ops"].items():
+        print(
+            f"{op:<16}{r['count']:>7}{r['errors']:>8}{r['p50_ms']:>10.1f}"
+            f"{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}{r['rps']:>9.1f}"
+        )
+    print(
+        f"total {report['requests']} requests in {report['wallSeconds']:.1f}s"
+        f" = {report['rps']:.1f} req/s"
+    )
+    if "groq" in report:
+        print(f"fake Groq: {report['groq']}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark: XMLParser.parse_summary (single-pass) vs parse_summary_regex
+on small, large and adversarial/malformed synthetic XML.
+The regex engine is quadratic on the adversarial and malformed cases
+(seconds per run), so those are timed --slow-repeat times (default 1).
+Run: python -m api.scripts.bench_xml_parser [--repeat 20] [--slow-repeat 1]
+     [--json out.json]
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from api.services.xml_parser import XMLParser
+
+
+def _risk(i):
+    sev = ("low", "medium", "high", "critical")[i % 4]
+    return (
+        f"<risk><id>{i}</id><title>Risk {i}</title>"
+        f"<description>Clause {i} lets the counterparty change terms unilaterally.</description>"
+        f"<severity>{sev}</severity></risk>"
+    )
+
+
+def make_summary(n_items: int) -> str:
+    return (
+        "<summary><title>Master Services Agreement</title>"
+        "<keyObligations>"
+        + "".join(
+            f"<obligation>Pay invoice {i} within 30 days</obligation>"
+            for i in range(n_items)
+        )
+        + "</keyObligations><risks>"
+        + "".join(_risk(i) for i in range(n_items))
+        + "</risks><suggestedEdits>"
+        + "".join(f"<edit>Cap liability for item {i}</edit>" for i in range(n_items))
+        + "</suggestedEdits><rights>"
+        + "".join(f"<right>Audit record {i}</right>" for i in range(n_items))
+        + "</rights></summary>"
+    )
+
+
+def make_cases() -> dict:
+    return {
+        "small": make_summary(3),
+        "large": make_summary(2000),
+        # many root openers and no closing root: quadratic for the old root regex
+        "adversarial_roots": "<summary " * 5000,
+        # unterminated items: every <risk> rescans to the end of the block
+        "adversarial_unclosed": "<summary><risks>"
+        + "<risk><id>1</id>" * 5000
+        + "</risks></summary>",
+        # truncated model output cut mid-document
+        "malformed_truncated": make_summary(500)[:-4000],
+    }
+
+
+def _run(fn, text):
+    try:
+        return fn(text)
+    except ValueError:
+        return None
+
+
+# cases the regex engine handles in quadratic time
+SLOW_FOR_REGEX = ("adversarial_roots", "adversarial_unclosed", "malformed_truncated")
+
+
+def measure(fn, text: str, repeat: int) -> dict:
+    # no separate warm-up: main() already ran fn once to compare engines
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _run(fn, text)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+
+    tracemalloc.start()
+    _run(fn, text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "median_ms": timings[len(timings) // 2] * 1000,
+        "min_ms": timings[0] * 1000,
+        "peak_alloc_kb": peak / 1024,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument(
+        "--slow-repeat", type=int, default=1, help="repeat for slow regex cases"
+    )
+    ap.add_argument("--json", help="write results to this file")
+    args = ap.parse_args()
+
+    parser = XMLParser()
+    engines = {
+        "single_pass": parser.parse_summary,
+        "regex": parser.parse_summary_regex,
+    }
+    results = {}
+    print(f"{'case':<22}{'engine':<13}{'size':>9}{'median ms':>11}{'peak KB':>10}")
+    for case, text in make_cases().items():
+        if _run(engines["single_pass"], text) != _run(engines["regex"], text):
+            raise SystemExit(f"engines disagree on case {case!r}")
+        for name, fn in engines.items():
+            slow = name == "regex" and case in SLOW_FOR_REGEX
+            r = measure(fn, text, args.slow_repeat if slow else args.repeat)
+            results[f"{case}/{name}"] = {"bytes": len(text), **r}
+            print(
+                f"{case:<22}{name:<13}{len(text):>9}"
+                f"{r['median_ms']:>11.3f}{r['peak_alloc_kb']:>10.1f}"
+            )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print("Wrote", args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Local stand-in for the Groq chat-completions API, for benchmarks that must
+not spend real quota. Answers every request with canned <summary> XML,
+with optional latency, jitter and injected 429/500 errors; supports
+"stream": true (SSE) like the real API.
+Run: python -m api.scripts.fake_groq [--port 8765] [--latency-ms 800] [--error-rate 0.05]
+then start the app with GROQ_API_URL=http://127.0.0.1:8765/openai/v1/chat/completions
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from api.scripts.bench_xml_parser import make_summary
+
+
+class FakeGroqServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # the default backlog of 5 drops connections when hundreds arrive at once
+    request_queue_size = 1024
+
+    def __init__(
+        self,
+        address,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        error_rate: float = 0.0,
+        xml: str = None,
+        stream_chunk_chars: int = 40,
+    ):
+        super().__init__(address, _Handler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.xml = xml or make_summary(5)
+        self.stream_chunk_chars = stream_chunk_chars
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0  # most requests being answered at once
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/openai/v1/chat/completions"
+
+    def delay(self) -> float:
+        ms = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        return max(0.0, ms) / 1000.0
+
+    def start_background(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: dict, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._send_json(400, {"error": {"message": "invalid JSON"}})
+
+        with server._lock:
+            server.requests += 1
+            fail = random.random() < server.error_rate
+            if fail:
+                server.errors += 1
+            server.in_flight += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+
+        time.sleep(server.delay())
+        with server._lock:
+            server.in_flight -= 1
+        if fail:
+            if random.random() < 0.5:
+                return self._send_json(
+                    429,
+                    {"error": {"message": "rate limited"}},
+                    {"Retry-After": "0"},
+                )
+            return self._send_json(500, {"error": {"message": "injected failure"}})
+
+        prompt = "".join(m.get("content", "") for m in payload.get("messages", []))
+        usage = {
+            "prompt_tokens": len(prompt) // 4,
+            "completion_tokens": len(server.xml) // 4,
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        model = payload.get("model", "fake")
+
+        if payload.get("stream"):
+            return self._stream(model, usage)
+        self._send_json(
+            200,
+            {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": server.xml},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": usage,
+            },
+        )
+
+    def _stream(self, model: str, usage: dict):
+        xml = self.server.xml
+        step = self.server.stream_chunk_chars
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        for i in range(0, len(xml), step):
+            event = {
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": xml[i : i + step]}}],
+            }
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+        final = {
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            "x_groq": {"usage": usage},
+        }
+        self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode())
+        self.wfile.flush()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency-ms", type=float, default=800)
+    ap.add_argument("--jitter-ms", type=float, default=200)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--risks", type=int, default=5, help="risks in the canned XML")
+    ap.add_argument("--xml-file", help="serve this XML instead of the generated one")
+    args = ap.parse_args()
+
+    xml = None
+    if args.xml_file:
+        with open(args.xml_file, encoding="utf-8") as f:
+            xml = f.read()
+    server = FakeGroqServer(
+        (args.host, args.port),
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        xml=xml or make_summary(args.risks),
+    )
+    print(f"fake Groq listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
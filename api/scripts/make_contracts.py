@@ -0,0 +1,204 @@
+"""
+Synthetic contracts for benchmarks: plain text, PDF and DOCX of a given
+size, built without any extra dependencies. Every seed yields different
+wording so the analysis cache does not flatter the numbers.
+Run: python -m api.scripts.make_contracts --out /tmp/contracts [--sizes 2000,20000,200000]
+"""
+
+import argparse
+import io
+import os
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+HEADINGS = (
+    "Definitions",
+    "Term and Termination",
+    "Payment",
+    "Confidentiality",
+    "Intellectual Property",
+    "Limitation of Liability",
+    "Indemnification",
+    "Governing Law",
+    "Assignment",
+    "Notices",
+    "Force Majeure",
+    "Non-Solicitation",
+)
+SUBJECTS = ("The Supplier", "The Customer", "Either party", "Each party", "Licensee")
+VERBS = ("shall", "must", "may", "shall not", "agrees to")
+ACTIONS = (
+    "deliver the services described in Schedule {n}",
+    "pay all undisputed invoices within {n} days of receipt",
+    "keep confidential information secret for {n} years",
+    "terminate this agreement on {n} days written notice",
+    "indemnify the other party against third-party claims up to {n} times the fees",
+    "renew automatically for successive periods of {n} months",
+    "not assign this agreement without prior written consent within {n} days",
+    "maintain insurance cover of at least {n} thousand dollars",
+)
+
+PAGE_LINES = 48
+LINE_CHARS = 90
+
+
+def make_text(target_chars: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts = [f"MASTER SERVICES AGREEMENT No. {seed}\n"]
+    size = len(parts[0])
+    clause = 0
+    while size < target_chars:
+        clause += 1
+        heading = f"\n{clause}. {HEADINGS[(clause - 1) % len(HEADINGS)]}\n"
+        sentences = [
+            f"{clause}.{i + 1} {rng.choice(SUBJECTS)} {rng.choice(VERBS)} "
+            + rng.choice(ACTIONS).format(n=rng.randint(2, 90))
+            + "."
+            for i in range(rng.randint(2, 6))
+        ]
+        block = heading + " ".join(sentences) + "\n"
+        parts.append(block)
+        size += len(block)
+    return "".join(parts)[: max(target_chars, 1)]
+
+
+def _wrap(text: str):
+    for paragraph in text.split("\n"):
+        while len(paragraph) > LINE_CHARS:
+            cut = paragraph.rfind(" ", 0, LINE_CHARS)
+            cut = cut if cut > 0 else LINE_CHARS
+            yield paragraph[:cut]
+            paragraph = paragraph[cut:].lstrip()
+        yield paragraph
+
+
+def _pdf_escape(line: str) -> bytes:
+    line = line.encode("latin-1", "replace").decode("latin-1")
+    line = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return line.encode("latin-1")
+
+
+def make_pdf(text: str) -> bytes:
+    """Minimal multi-page PDF with one Helvetica text stream per page."""
+    lines = list(_wrap(text))
+    pages = [lines[i : i + PAGE_LINES] for i in range(0, len(lines), PAGE_LINES)]
+    pages = pages or [[""]]
+
+    objects = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    pages_id = font + 2 * len(pages) + 1
+    kids = []
+    for page in pages:
+        stream = b"BT /F1 10 Tf 50 780 Td 14 TL " + b" ".join(
+            b"(" + _pdf_escape(line) + b") '" for line in page
+        )
+        stream += b" ET"
+        contents = add(
+            b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        )
+        kids.append(
+            add(
+                b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] "
+                b"/Contents %d 0 R /Resources << /Font << /F1 %d 0 R >> >> >>"
+                % (pages_id, contents, font)
+            )
+        )
+    add(
+        b"<< /Type /Pages /Kids ["
+        + b" ".join(b"%d 0 R" % k for k in kids)
+        + b"] /Count %d >>" % len(kids)
+    )
+    catalog = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % i + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    out.write(b"".join(b"%010d 00000 n \n" % o for o in offsets))
+    out.write(
+        b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+        % (len(objects) + 1, catalog, xref)
+    )
+    return out.getvalue()
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    "</Types>"
+)
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>'
+    "</Relationships>"
+)
+
+
+def make_docx(text: str) -> bytes:
+    """Minimal WordprocessingML package, one paragraph per line."""
+    body = "".join(
+        f'<w:p><w:r><w:t xml:space="preserve">{escape(line)}</w:t></w:r></w:p>'
+        for line in text.split("\n")
+    )
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{body}</w:body></w:document>"
+    )
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        z.writestr("_rels/.rels", _RELS)
+        z.writestr("word/document.xml", document)
+    return out.getvalue()
+
+
+def make_contract(kind: str, target_chars: int, seed: int = 0):
+    """Returns (filename, bytes) for kind in txt|pdf|docx."""
+    text = make_text(target_chars, seed)
+    if kind == "pdf":
+        return f"contract-{seed}.pdf", make_pdf(text)
+    if kind == "docx":
+        return f"contract-{seed}.docx", make_docx(text)
+    if kind == "txt":
+        return f"contract-{seed}.txt", text.encode("utf-8")
+    raise ValueError(f"Unknown contract kind: {kind}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", required=True)
+    ap.add_argument("--sizes", default="2000,20000,200000", help="characters")
+    ap.add_argument("--kinds", default="txt,pdf,docx")
+    ap.add_argument("--count", type=int, default=1, help="files per size and kind")
+    args = ap.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    seed = 0
+    for size in (int(s) for s in args.sizes.split(",")):
+        for kind in args.kinds.split(","):
+            for _ in range(args.count):
+                seed += 1
+                filename, content = make_contract(kind, size, seed)
+                name = f"{size}-{filename}"
+                with open(os.path.join(args.out, name), "wb") as f:
+                    f.write(content)
+                print(f"{name:<32} {len(content):>10} bytes")
+
+
+if __name__ == "__main__":
+    main()
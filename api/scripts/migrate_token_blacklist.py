@@ -0,0 +1,30 @@
+"""
+One-off migration: token_blacklist entries saved with a numeric expiresAt
+(before it was stored as a date) are invisible to the TTL index. Deletes
+the expired ones and converts the rest to dates. Safe to re-run; it only
+touches entries whose expiresAt is still a number.
+Run: python -m api.scripts.migrate_token_blacklist [--batch-size 500]
+"""
+
+import argparse
+import time
+
+from api.services.user_service import UserService
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--batch-size", type=int, default=500)
+    args = ap.parse_args()
+    start = time.perf_counter()
+    deleted, converted = UserService().migrate_blacklist_expiry(
+        batch_size=args.batch_size
+    )
+    print(
+        f"Deleted {deleted} expired and converted {converted} blacklist entries "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
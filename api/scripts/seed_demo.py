@@ -1,15 +1,99 @@
 """
 Seed script: creates demo user and a demo contract summary
 Run: python -m api.scripts.seed_demo
+
+Bulk mode generates synthetic users and contracts for scale testing
+(indexes, list/search latency on multi-million contract collections):
+  python -m api.scripts.seed_demo --users 10000 --contracts 1000
+      [--batch-size 1000] [--workers 8] [--days 730] [--seed 0]
+      [--skip-indexes] [--in-memory]
+Contracts get varied summaries (risk counts, severities, upload dates),
+are written with unordered insert_many batches from --workers threads,
+and insert throughput is printed as it goes. Indexes are built after the
+load, which is faster than maintaining them during it.
 """
 
+import argparse
+import datetime
 import os
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from api.scripts.bench_auth_login import use_in_memory_mongo
 
-from api.services.contract_service import ContractService
-from api.services.user_service import UserService
+PARTIES = (
+    "Acme",
+    "Globex",
+    "Initech",
+    "Umbrella",
+    "Stark Industries",
+    "Wayne Enterprises",
+    "Hooli",
+    "Vandelay Imports",
+    "Soylent",
+    "Tyrell",
+)
+KINDS = (
+    "Service Agreement",
+    "Non-Disclosure Agreement",
+    "Lease",
+    "Employment Contract",
+    "Consulting Agreement",
+    "Software License",
+    "Supply Agreement",
+    "Subscription Terms",
+)
+# (title, description) pairs; descriptions take a random {n}
+RISKS = (
+    ("Auto-renew", "Renews automatically every {n} months unless cancelled"),
+    ("Unlimited liability", "No cap on liability for breaches of clause {n}"),
+    ("Broad indemnity", "You indemnify the other party for claims up to {n}x fees"),
+    ("Short notice period", "Either party may terminate on {n} days notice"),
+    ("Late payment penalty", "Late invoices accrue {n}% interest per month"),
+    ("Non-compete", "Restricts similar work for {n} months after termination"),
+    ("Unilateral changes", "Terms may change with {n} days notice by email"),
+    ("IP assignment", "All work product, including prior work, is assigned"),
+    ("Data sharing", "Customer data may be shared with {n} named affiliates"),
+    ("Exclusive jurisdiction", "Disputes are heard only in the courts of clause {n}"),
+    ("Early termination fee", "Cancelling early costs {n} months of fees"),
+    ("Confidentiality term", "Confidentiality survives for {n} years"),
+)
+# weights per severity: most findings are minor, few are critical
+SEVERITIES = (("low", 40), ("medium", 35), ("high", 20), ("critical", 5))
+# risk-count distribution: many clean contracts, a long tail of bad ones
+RISK_COUNTS = (0, 1, 1, 2, 2, 2, 3, 3, 4, 5, 6, 8)
+OBLIGATIONS = (
+    "Pay ${n}/month",
+    "Provide access to the service",
+    "Give {n} days notice before termination",
+    "Keep confidential information secret",
+    "Maintain insurance of at least ${n}k",
+    "Deliver monthly reports",
+    "Return materials within {n} days of termination",
+)
+RIGHTS = (
+    "Access during subscription",
+    "Terminate for material breach",
+    "Audit records once per year",
+    "Receive {n} days notice of price changes",
+    "Request deletion of personal data",
+)
+EDITS = (
+    "Negotiate cancellation terms",
+    "Cap liability at {n} months of fees",
+    "Limit non-compete to {n} months",
+    "Require written consent for changes",
+    "Narrow the indemnity to third-party claims",
+)
 
 
 def seed():
+    from api.services.contract_service import ContractService
+    from api.services.user_service import UserService
+
     us = UserService()
     cs = ContractService()
     email = os.getenv("DEMO_EMAIL", "demo@example.com")
@@ -43,5 +127,178 @@ def seed():
     print("Inserted demo contract:", doc["id"])
 
 
+def _fill(rng, template: str) -> str:
+    return template.format(n=rng.randint(2, 90))
+
+
+def _pick(rng, options, low: int, high: int) -> list:
+    return [_fill(rng, t) for t in rng.sample(options, rng.randint(low, high))]
+
+
+def make_summary(rng, title: str) -> dict:
+    risks = []
+    picked = rng.sample(RISKS, rng.choice(RISK_COUNTS))
+    for i, (risk_title, description) in enumerate(picked, start=1):
+        risks.append(
+            {
+                "id": str(i),
+                "title": risk_title,
+                "description": _fill(rng, description),
+                "severity": rng.choices(
+                    [s for s, _ in SEVERITIES], [w for _, w in SEVERITIES]
+                )[0],
+            }
+        )
+    return {
+        "title": title,
+        "keyObligations": _pick(rng, OBLIGATIONS, 1, 4),
+        "risks": risks,
+        "suggestedEdits": _pick(rng, EDITS, 0, 3),
+        "rights": _pick(rng, RIGHTS, 1, 3),
+    }
+
+
+class Progress:
+    """Thread-safe insert counter that prints throughput every few seconds."""
+
+    def __init__(self, label: str, total: int, every_seconds: float = 5.0):
+        self.label = label
+        self.total = total
+        self.every_seconds = every_seconds
+        self.done = 0
+        self.start = time.perf_counter()
+        self._last_print = self.start
+        self._lock = threading.Lock()
+
+    def add(self, n: int):
+        with self._lock:
+            self.done += n
+            now = time.perf_counter()
+            if now - self._last_print < self.every_seconds:
+                return
+            self._last_print = now
+            elapsed = now - self.start
+            print(
+                f"  {self.label}: {self.done}/{self.total}"
+                f" ({self.done / elapsed:,.0f}/s)"
+            )
+
+    def report(self) -> dict:
+        elapsed = time.perf_counter() - self.start
+        print(
+            f"{self.label}: {self.done} in {elapsed:.1f}s"
+            f" ({self.done / elapsed if elapsed else 0:,.0f}/s)"
+        )
+        return {"count": self.done, "seconds": elapsed}
+
+
+def seed_users(us, count: int, batch_size: int, pool) -> list:
+    """Insert count users; all share one password hash (bcrypt is slow)."""
+    from bson.objectid import ObjectId
+
+    from api.services.password_hasher import password_hasher
+
+    hashed = password_hasher.hash(os.getenv("DEMO_PASSWORD", "password123"))
+    run = uuid.uuid4().hex[:8]
+    created = datetime.datetime.utcnow().isoformat()
+    ids = [ObjectId() for _ in range(count)]
+    progress = Progress("users", count)
+
+    def insert(start: int):
+        docs = [
+            {
+                "_id": ids[i],
+                "first_name": None,
+                "last_name": None,
+                "email": f"seed-{run}-{i}@example.com",
+                "password": hashed,
+                "createdAt": created,
+            }
+            for i in range(start, min(start + batch_size, count))
+        ]
+        us.col.insert_many(docs, ordered=False)
+        progress.add(len(docs))
+
+    list(pool.map(insert, range(0, count, batch_size)))
+    progress.report()
+    print("Seed users log in as", f"seed-{run}-<n>@example.com")
+    return [str(i) for i in ids]
+
+
+def seed_contracts(cs, user_ids: list, per_user: int, args, pool) -> dict:
+    """
+    Insert per_user contracts for every user. Work is split into batches
+    over the global contract index (contract i belongs to user
+    i // per_user), so a few users with many contracts parallelize as
+    well as many users with a few. Each batch has its own RNG seed,
+    which makes a run reproducible regardless of thread scheduling.
+    """
+    total = len(user_ids) * per_user
+    now = datetime.datetime.utcnow()
+    span = args.days * 86400
+    progress = Progress("contracts", total)
+
+    def insert(start: int):
+        rng = random.Random(f"{args.seed}:{start}")
+        docs = []
+        for i in range(start, min(start + args.batch_size, total)):
+            title = f"{rng.choice(PARTIES)} {rng.choice(KINDS)}"
+            status = "failed" if rng.random() < 0.02 else "summarized"
+            doc = cs._new_doc(
+                user_ids[i // per_user], title, make_summary(rng, title), status
+            )
+            uploaded = now - datetime.timedelta(seconds=rng.uniform(0, span))
+            edited = uploaded
+            if rng.random() < 0.2:  # some contracts were edited later
+                edited += (now - uploaded) * rng.random()
+            doc["uploadDate"] = uploaded.isoformat()
+            doc["updatedAt"] = edited.isoformat()
+            docs.append(doc)
+        cs.col.insert_many(docs, ordered=False)
+        progress.add(len(docs))
+
+    list(pool.map(insert, range(0, total, args.batch_size)))
+    return progress.report()
+
+
+def seed_bulk(args):
+    from api.services.contract_service import ContractService
+    from api.services.user_service import UserService
+
+    us = UserService()
+    cs = ContractService()
+    print(
+        f"Seeding {args.users} users x {args.contracts} contracts"
+        f" (batch {args.batch_size}, {args.workers} workers)"
+    )
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        user_ids = seed_users(us, args.users, args.batch_size, pool)
+        seed_contracts(cs, user_ids, args.contracts, args, pool)
+    if not args.skip_indexes:
+        start = time.perf_counter()
+        us.ensure_indexes()
+        cs.ensure_indexes()
+        print(f"indexes: built in {time.perf_counter() - start:.1f}s")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=0, help="0: the single demo user")
+    ap.add_argument("--contracts", type=int, default=100, help="contracts per user")
+    ap.add_argument("--batch-size", type=int, default=1000, help="docs per insert")
+    ap.add_argument("--workers", type=int, default=4, help="parallel inserters")
+    ap.add_argument("--days", type=int, default=730, help="upload date spread")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--skip-indexes", action="store_true")
+    ap.add_argument("--in-memory", action="store_true", help="use mongomock")
+    args = ap.parse_args()
+    if args.in_memory:
+        use_in_memory_mongo()
+    if args.users:
+        seed_bulk(args)
+    else:
+        seed()
+
+
 if __name__ == "__main__":
-    seed()
+    main()
@@ -1,5 +1,20 @@
-from api.services.groq_client import GroqClient
-from api.services.xml_parser import XMLParser
+import asyncio
+import contextvars
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from api.config import Config
+from api.services.analysis_cache import AnalysisCache, make_cache_key
+from api.services.async_runtime import offload, offload_wait
+from api.services.chunking import chunk_text, estimate_tokens, truncate_to_tokens
+from api.services.groq_client import AsyncGroqClient, GroqClient
+from api.services.metrics import metrics
+from api.services.model_router import ModelRouter
+from api.services.single_flight import MongoLease, SingleFlight
+from api.services.summary_merge import merge_summaries
+from api.services.text_normalizer import normalize_contract_text
+from api.services.xml_parser import IncrementalXMLParser, XMLParser
 
 # system prompt that MUST be used by Groq to produce XML only
 GROQ_SYSTEM_PROMPT = """
@@ -17,60 +32,566 @@ Each XML node must be present even if empty (provide empty tags if needed).
 Return only the XML (no commentary, no JSON, no markdown).
 """
 
+SUMMARY_INSTRUCTION = (
+    "Analyze the following contract and return the structured XML with root <summary>."
+)
+CHUNK_INSTRUCTION = (
+    "\nThe text below is one section of a longer contract; analyze only this section."
+)
+
+DETAILED_SYSTEM_PROMPT = (
+    GROQ_SYSTEM_PROMPT
+    + "\nNow produce a more thorough, clause-level analysis and expand each <risk> with concrete mitigation steps where possible."
+)
+DETAILED_INSTRUCTION = (
+    "Please perform a detailed clause-level analysis and return XML as described."
+)
+
+REVISION_INSTRUCTION = (
+    "The clauses below were added or changed in a revised version of the contract."
+    " Analyze only these clauses and return the structured XML with root <summary>."
+)
+
+_CHUNK_DONE = object()
+
 
 class AIAgent:
-    def __init__(self, api_key=None, api_url=None):
+    def __init__(self, api_key=None, api_url=None, cache=None):
         self.client = GroqClient(api_key=api_key, api_url=api_url)
+        # coroutine variant, only used on the AI loop (async_runtime)
+        self.async_client = AsyncGroqClient(api_key=api_key, api_url=api_url)
         self.parser = XMLParser()
+        if cache is None and Config.ANALYSIS_CACHE_ENABLED:
+            cache = AnalysisCache()
+        self.cache = cache
+        # identical in-flight analyses share one Groq call
+        self.flights = SingleFlight() if Config.AI_COALESCE_ENABLED else None
+        # across instances, results meet in the Mongo tier of the cache
+        self.leases = None
+        if (
+            self.flights is not None
+            and Config.AI_COALESCE_MONGO_LEASE
+            and cache is not None
+            and cache.col is not None
+        ):
+            self.leases = MongoLease()
+        # task ("summary" / "detailed") -> models, with fallback
+        self.router = ModelRouter()
+        self.chunked = Config.AI_CHUNKED_ENABLED
+        self.chunk_max_tokens = Config.AI_CHUNK_MAX_TOKENS
+        self.max_chunks = Config.AI_MAX_CHUNKS
+        self.chunk_ceiling_tokens = max(
+            Config.AI_CHUNK_CEILING_TOKENS, self.chunk_max_tokens
+        )
+        self.chunk_concurrency = max(1, Config.AI_CHUNK_CONCURRENCY)
+        self.normalize = Config.AI_NORMALIZE_TEXT
+        self._chunk_pool = None
+        self._chunk_pool_lock = threading.Lock()
 
-    def summarize_contract(self, contract_text: str, title: str = None):
-        user_prompt = "Analyze the following contract and return the structured XML with root <summary>."
+    def _get_chunk_pool(self):
+        # shared by all requests; chunk_concurrency caps each request's share
+        with self._chunk_pool_lock:
+            if self._chunk_pool is None:
+                self._chunk_pool = ThreadPoolExecutor(
+                    max_workers=Config.AI_CHUNK_POOL_WORKERS,
+                    thread_name_prefix="ai-chunk",
+                )
+            return self._chunk_pool
+
+    def _fan_out(self, fn, arg_lists) -> list:
+        """
+        Submit fn(*args) for each args to the chunk pool, keeping at most
+        chunk_concurrency of them in flight. Each runs in a copy of the
+        caller's context, so its metrics stages and notes reach the
+        request log. Returns futures in order.
+        """
+        pool = self._get_chunk_pool()
+        slots = threading.Semaphore(self.chunk_concurrency)
+        futures = []
+        for args in arg_lists:
+            slots.acquire()
+            future = pool.submit(contextvars.copy_context().run, fn, *args)
+            future.add_done_callback(lambda _: slots.release())
+            futures.append(future)
+        return futures
+
+    def _chunk(self, contract_text: str):
+        """
+        Chunks covering the whole text in at most max_chunks: the chunk
+        size grows from chunk_max_tokens up to chunk_ceiling_tokens as
+        needed. Returns (chunks, dropped), dropped counting chunks cut
+        off because even the ceiling was not enough.
+        """
+        budget = self.chunk_max_tokens
+        chunks = chunk_text(contract_text, budget)
+        while len(chunks) > self.max_chunks and budget < self.chunk_ceiling_tokens:
+            budget = min(
+                self.chunk_ceiling_tokens,
+                max(budget + 1, budget * len(chunks) // self.max_chunks),
+            )
+            chunks = chunk_text(contract_text, budget)
+        metrics.note("chunkTokens", budget)
+        dropped = max(0, len(chunks) - self.max_chunks)
+        if dropped:
+            metrics.inc("legalbuddy_chunks_dropped_total", dropped)
+            metrics.note("chunksDropped", dropped)
+        return chunks[: self.max_chunks], dropped
+
+    def _split(self, contract_text: str, instruction: str):
+        """
+        Returns (chunks, instruction, truncated); truncated is True when
+        part of the contract is not in any chunk.
+        """
+        raw_tokens = estimate_tokens(contract_text)
+        if self.normalize:
+            contract_text, _ = normalize_contract_text(contract_text)
+        normalized_tokens = estimate_tokens(contract_text)
+
+        truncated = False
+        if not self.chunked or normalized_tokens <= self.chunk_max_tokens:
+            chunks = [truncate_to_tokens(contract_text, self.chunk_max_tokens)]
+        else:
+            chunks, dropped = self._chunk(contract_text)
+            truncated = dropped > 0
+            instruction += CHUNK_INSTRUCTION
+        self._record_tokens(
+            raw_tokens, normalized_tokens, sum(estimate_tokens(c) for c in chunks)
+        )
+        return chunks, instruction, truncated
+
+    def _merge(self, parts: list, title: str, truncated: bool) -> dict:
+        parsed = merge_summaries(parts, title=title)
+        if truncated:
+            # the contract ran past AI_MAX_CHUNKS at the chunk ceiling
+            parsed["truncated"] = True
+        return parsed
+
+    def _record_tokens(self, raw: int, normalized: int, sent: int):
+        # saved = removed by normalization; truncation shows as normalized - sent
+        metrics.inc("legalbuddy_prompt_tokens_total", raw, kind="raw")
+        metrics.inc("legalbuddy_prompt_tokens_total", normalized, kind="normalized")
+        metrics.inc("legalbuddy_prompt_tokens_total", sent, kind="sent")
+        metrics.note("tokensRaw", raw)
+        metrics.note("tokensSent", sent)
+        metrics.note("tokensSaved", raw - normalized)
+
+    def _build_user_prompt(self, instruction: str, contract_text: str, title: str):
+        user_prompt = instruction
         if title:
             user_prompt += f"\nTitle: {title}"
-        user_prompt += (
-            f"\n\nContractTextStart\n{contract_text[:20000]}\nContractTextEnd"
+        user_prompt += f"\n\nContractTextStart\n{contract_text}\nContractTextEnd"
+        return user_prompt
+
+    def _cache_key(
+        self, system_prompt, instruction, contract_text, title, max_tokens, task
+    ):
+        if self.cache is None and self.flights is None:
+            return None
+        # keyed by the task's primary model, which is the answer the cache
+        # holds (see _cacheable); also the coalescing key
+        return make_cache_key(
+            contract_text,
+            title,
+            system_prompt,
+            instruction,
+            self.router.primary(task),
+            max_tokens,
         )
 
+    def _analyze(
+        self,
+        system_prompt: str,
+        instruction: str,
+        contract_text: str,
+        title: str = None,
+        max_tokens: int = 3000,
+        task: str = "summary",
+    ):
+        with metrics.timed("ai.analyze"):
+            return self._analyze_chunks(
+                system_prompt, instruction, contract_text, title, max_tokens, task
+            )
+
+    def _analyze_chunks(
+        self, system_prompt, instruction, contract_text, title, max_tokens, task
+    ):
+        chunks, instruction, truncated = self._split(contract_text, instruction)
+        if len(chunks) == 1:
+            return self._analyze_text(
+                system_prompt, instruction, chunks[0], title, max_tokens, task
+            )
+
+        futures = self._fan_out(
+            self._analyze_text,
+            [
+                (system_prompt, instruction, chunk, title, max_tokens, task)
+                for chunk in chunks
+            ],
+        )
+        # .result() re-raises the first chunk failure in document order
+        results = [f.result() for f in futures]
+        parsed = self._merge([p for p, _ in results], title, truncated)
+        return parsed, "\n".join(xml for _, xml in results)
+
+    def _analyze_text(
+        self,
+        system_prompt: str,
+        instruction: str,
+        contract_text: str,
+        title: str = None,
+        max_tokens: int = 3000,
+        task: str = "summary",
+    ):
+        key = self._cache_key(
+            system_prompt, instruction, contract_text, title, max_tokens, task
+        )
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        def call():
+            return self._call_model(
+                system_prompt, instruction, contract_text, title, max_tokens, task, key
+            )
+
+        if self.flights is None:
+            return call()
+        return self.flights.do(key, lambda: self._lead(key, call))
+
+    def _lead(self, key, call):
+        # this process runs the analysis unless another instance already is
+        if self.leases is None:
+            return call()
+        if not self.leases.acquire(key):
+            found = self.leases.wait(key, self.cache.get)
+            if found is not None:
+                return found
+            # stale, or released without a result: analyze here instead
+            self.leases.acquire(key)
+        try:
+            result = call()
+        except Exception as e:
+            self.leases.release(key, error=e)
+            raise
+        self.leases.release(key)
+        return result
+
+    def _call_model(
+        self, system_prompt, instruction, contract_text, title, max_tokens, task, key
+    ):
+        user_prompt = self._build_user_prompt(instruction, contract_text, title)
         try:
-            xml = self.client.chat_completion(
-                system_prompt=GROQ_SYSTEM_PROMPT, user_prompt=user_prompt
+            model, xml = self.router.call(
+                task,
+                lambda model, retries: self.client.chat_completion(
+                    system_prompt=system_prompt,
+                    user_prompt=user_prompt,
+                    model=model,
+                    max_tokens=max_tokens,
+                    max_retries=retries,
+                ),
             )
         except Exception as e:
             raise RuntimeError(f"AI call failed: {e}")
 
+        parsed = self._parse(xml)
+        if self.cache is not None and self._cacheable(task, model):
+            self.cache.set(key, parsed, xml)
+        return parsed, xml  # return parsed dict + raw xml (raw xml not stored)
+
+    def _parse(self, xml: str) -> dict:
         # ensure xml content includes <summary>
-        if "<summary" not in xml:
+        if not xml or "<summary" not in xml:
             raise RuntimeError("AI returned no <summary> element")
 
         try:
-            parsed = self.parser.parse_summary(xml)
+            with metrics.timed("ai.parse"):
+                return self.parser.parse_summary(xml)
         except ValueError as e:
             raise ValueError(f"Unable to parse AI response: {e}")
 
-        return parsed, xml  # return parsed dict + raw xml (raw xml not stored)
+    def _cacheable(self, task: str, model: str) -> bool:
+        # a fallback model's answer would otherwise be served under the
+        # primary's key until the TTL, long after the primary recovered
+        if model == self.router.primary(task):
+            return True
+        metrics.inc("legalbuddy_cache_skipped_total", cache="analysis", model=model)
+        return False
 
-    def detailed_analysis(self, contract_text: str, title: str = None):
-        system = (
-            GROQ_SYSTEM_PROMPT
-            + "\nNow produce a more thorough, clause-level analysis and expand each <risk> with concrete mitigation steps where possible."
+    async def _aanalyze(
+        self,
+        system_prompt: str,
+        instruction: str,
+        contract_text: str,
+        title: str = None,
+        max_tokens: int = 3000,
+        task: str = "summary",
+    ):
+        """
+        _analyze as a coroutine on the AI loop: chunks are awaited together
+        instead of occupying chunk-pool threads, and normalization and
+        cache lookups (Mongo) run on the async I/O pool.
+        """
+        with metrics.timed("ai.analyze"):
+            chunks, instruction, truncated = await offload(
+                self._split, contract_text, instruction
+            )
+            if len(chunks) == 1:
+                return await self._aanalyze_text(
+                    system_prompt, instruction, chunks[0], title, max_tokens, task
+                )
+
+            # async counterpart of _fan_out's per-request cap
+            slots = asyncio.Semaphore(self.chunk_concurrency)
+
+            async def analyze_chunk(chunk):
+                async with slots:
+                    return await self._aanalyze_text(
+                        system_prompt, instruction, chunk, title, max_tokens, task
+                    )
+
+            results = await asyncio.gather(*(analyze_chunk(c) for c in chunks))
+            parsed = self._merge([p for p, _ in results], title, truncated)
+            return parsed, "\n".join(xml for _, xml in results)
+
+    async def _aanalyze_text(
+        self, system_prompt, instruction, contract_text, title, max_tokens, task
+    ):
+        key = self._cache_key(
+            system_prompt, instruction, contract_text, title, max_tokens, task
         )
-        user_prompt = "Please perform a detailed clause-level analysis and return XML as described."
-        if title:
-            user_prompt += f"\nTitle: {title}"
-        user_prompt += (
-            f"\n\nContractTextStart\n{contract_text[:20000]}\nContractTextEnd"
+        if self.cache is not None:
+            cached = await offload(self.cache.get, key)
+            if cached is not None:
+                return cached
+
+        async def call():
+            return await self._acall_model(
+                system_prompt, instruction, contract_text, title, max_tokens, task, key
+            )
+
+        if self.flights is None:
+            return await call()
+        return await self.flights.ado(key, lambda: self._alead(key, call))
+
+    async def _alead(self, key, call):
+        if self.leases is None:
+            return await call()
+        if not await offload(self.leases.acquire, key):
+            found = await offload_wait(self.leases.wait, key, self.cache.get)
+            if found is not None:
+                return found
+            # stale, or released without a result: analyze here instead
+            await offload(self.leases.acquire, key)
+        try:
+            result = await call()
+        except Exception as e:
+            await offload(self.leases.release, key, e)
+            raise
+        await offload(self.leases.release, key)
+        return result
+
+    async def _acall_model(
+        self, system_prompt, instruction, contract_text, title, max_tokens, task, key
+    ):
+        user_prompt = self._build_user_prompt(instruction, contract_text, title)
+        try:
+            model, xml = await self.router.acall(
+                task,
+                lambda model, retries: self.async_client.achat_completion(
+                    system_prompt=system_prompt,
+                    user_prompt=user_prompt,
+                    model=model,
+                    max_tokens=max_tokens,
+                    max_retries=retries,
+                ),
+            )
+        except Exception as e:
+            raise RuntimeError(f"AI call failed: {e}")
+
+        parsed = self._parse(xml)
+        if self.cache is not None and self._cacheable(task, model):
+            await offload(self.cache.set, key, parsed, xml)
+        return parsed, xml
+
+    def _stream_text(
+        self,
+        system_prompt: str,
+        instruction: str,
+        contract_text: str,
+        title: str,
+        max_tokens: int,
+        task: str = "summary",
+    ):
+        """
+        Generator of one chunk's events; returns its parsed summary.
+        """
+        key = self._cache_key(
+            system_prompt, instruction, contract_text, title, max_tokens, task
         )
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            parsed = cached[0]
+            for o in parsed.get("keyObligations") or []:
+                yield "obligation", o
+            for r in parsed.get("risks") or []:
+                yield "risk", r
+            for e in parsed.get("suggestedEdits") or []:
+                yield "edit", e
+            for r in parsed.get("rights") or []:
+                yield "right", r
+            return parsed
+
+        user_prompt = self._build_user_prompt(instruction, contract_text, title)
+
+        def attempt(model, retries):
+            stream_parser = IncrementalXMLParser()
+            started = False
+            try:
+                for delta in self.client.stream_chat_completion(
+                    system_prompt=system_prompt,
+                    user_prompt=user_prompt,
+                    model=model,
+                    max_tokens=max_tokens,
+                    max_retries=retries,
+                ):
+                    for event in stream_parser.feed(delta):
+                        started = True
+                        yield event
+            except Exception as e:
+                # events already went out: switching models would mix answers
+                if started:
+                    raise RuntimeError(f"AI stream interrupted: {e}")
+                raise
+            return stream_parser
+
         try:
-            xml = self.client.chat_completion(system, user_prompt, max_tokens=3000)
+            model, stream_parser = yield from self.router.stream(task, attempt)
         except Exception as e:
             raise RuntimeError(f"AI call failed: {e}")
 
+        xml = stream_parser.text()
         if "<summary" not in xml:
             raise RuntimeError("AI returned no <summary> element")
-
         try:
-            parsed = self.parser.parse_summary(xml)
+            parsed = stream_parser.close()
         except ValueError as e:
             raise ValueError(f"Unable to parse AI response: {e}")
 
-        return parsed, xml
+        if self.cache is not None and self._cacheable(task, model):
+            self.cache.set(key, parsed, xml)
+        return parsed
+
+    def _stream_chunk(self, emit, *args):
+        # pool side of a multi-chunk stream: events go through emit
+        events = self._stream_text(*args)
+        try:
+            while True:
+                emit(next(events))
+        except StopIteration as done:
+            return done.value
+        finally:
+            emit(_CHUNK_DONE)
+
+    def stream_summary(self, contract_text: str, title: str = None):
+        """
+        Streaming variant of summarize_contract.
+        Yields ("risk" | "obligation" | "right" | "edit", value) events as
+        soon as each element is complete, then ("summary", merged_summary).
+        A single chunk streams in the caller's thread; chunks of longer
+        contracts share the chunk pool, chunk_concurrency at a time.
+        """
+        chunks, instruction, truncated = self._split(contract_text, SUMMARY_INSTRUCTION)
+        if len(chunks) == 1:
+            parsed = yield from self._stream_text(
+                GROQ_SYSTEM_PROMPT, instruction, chunks[0], title, 3000
+            )
+            yield "summary", parsed
+            return
+
+        events = queue.Queue()
+        pool = self._get_chunk_pool()
+        pending = iter(chunks)
+        futures = []
+
+        def submit_next():
+            chunk = next(pending, None)
+            if chunk is not None:
+                futures.append(
+                    pool.submit(
+                        contextvars.copy_context().run,
+                        self._stream_chunk,
+                        events.put,
+                        GROQ_SYSTEM_PROMPT,
+                        instruction,
+                        chunk,
+                        title,
+                        3000,
+                    )
+                )
+
+        for _ in range(self.chunk_concurrency):
+            submit_next()
+        done = 0
+        while done < len(chunks):
+            event = events.get()
+            if event is _CHUNK_DONE:
+                done += 1
+                # a finished chunk frees this request's slot for the next
+                submit_next()
+                continue
+            yield event
+
+        results = [f.result() for f in futures]
+        yield "summary", self._merge(results, title, truncated)
+
+    def summarize_contract(self, contract_text: str, title: str = None):
+        return self._analyze(
+            GROQ_SYSTEM_PROMPT,
+            SUMMARY_INSTRUCTION,
+            contract_text,
+            title=title,
+        )
+
+    def detailed_analysis(self, contract_text: str, title: str = None):
+        return self._analyze(
+            DETAILED_SYSTEM_PROMPT,
+            DETAILED_INSTRUCTION,
+            contract_text,
+            title=title,
+            max_tokens=3000,
+            task="detailed",
+        )
+
+    async def asummarize_contract(self, contract_text: str, title: str = None):
+        return await self._aanalyze(
+            GROQ_SYSTEM_PROMPT,
+            SUMMARY_INSTRUCTION,
+            contract_text,
+            title=title,
+        )
+
+    def analyze_revision(self, clauses: list, title: str = None):
+        """
+        Analyze only the changed/new clauses of a revision; the caller
+        merges the result into the summary of the previous version.
+        """
+        return self._analyze(
+            GROQ_SYSTEM_PROMPT,
+            REVISION_INSTRUCTION,
+            "\n\n".join(clauses),
+            title=title,
+        )
+
+    def model_stats(self) -> dict:
+        return self.router.stats()
+
+    def cache_stats(self) -> dict:
+        stats = {"enabled": self.cache is not None}
+        if self.cache is not None:
+            stats.update(self.cache.stats())
+        if self.flights is not None:
+            stats["coalesced"] = self.flights.coalesced
+            stats["inFlight"] = self.flights.in_flight()
+        return stats
@@ -0,0 +1,153 @@
+import copy
+import datetime
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+from pymongo.errors import PyMongoError
+
+from api.config import Config
+from api.extensions import get_db
+from api.services.metrics import metrics
+
+
+def normalize_for_key(text: str) -> str:
+    # whitespace-only differences should not defeat the cache
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def make_cache_key(
+    contract_text: str,
+    title: str,
+    system_prompt: str,
+    instruction: str,
+    model: str,
+    max_tokens: int,
+) -> str:
+    h = hashlib.sha256()
+    for part in (
+        normalize_for_key(contract_text),
+        title or "",
+        system_prompt,
+        # chunks are sent with CHUNK_INSTRUCTION appended
+        instruction or "",
+        model,
+        str(max_tokens),
+    ):
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+class AnalysisCache:
+    """
+    Two-tier cache for parsed AI analyses.
+    Tier 1 is an in-process LRU, tier 2 a shared Mongo collection whose
+    entries are evicted by a TTL index on createdAt.
+    """
+
+    def __init__(
+        self, max_entries: int = None, ttl_seconds: int = None, use_mongo: bool = True
+    ):
+        self.max_entries = max_entries or Config.ANALYSIS_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds or Config.ANALYSIS_CACHE_TTL_SECONDS
+        self.col = get_db()["analysis_cache"] if use_mongo else None
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._indexes_ready = False
+        self.hits = 0
+        self.misses = 0
+        self.mongo_hits = 0
+
+    def ensure_indexes(self):
+        if self.col is None or self._indexes_ready:
+            return
+        try:
+            self.col.create_index("createdAt", expireAfterSeconds=self.ttl_seconds)
+            self._indexes_ready = True
+        except PyMongoError as e:
+            print("Could not create analysis cache index:", e)
+
+    def _now(self):
+        return datetime.datetime.utcnow()
+
+    def _lru_get(self, key):
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is None:
+                return None
+            parsed, raw_xml, created = entry
+            if (self._now() - created).total_seconds() > self.ttl_seconds:
+                del self._lru[key]
+                return None
+            self._lru.move_to_end(key)
+            # callers may mutate the summary before saving it
+            return copy.deepcopy(parsed), raw_xml
+
+    def _lru_put(self, key, parsed, raw_xml, created=None):
+        # a private copy: the caller keeps (and may mutate) the one it passed,
+        # including the Mongo-tier result that get() returns
+        parsed = copy.deepcopy(parsed)
+        with self._lock:
+            self._lru[key] = (parsed, raw_xml, created or self._now())
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def get(self, key):
+        """
+        Returns (parsed, raw_xml) or None.
+        """
+        found = self._lru_get(key)
+        if found is None and self.col is not None:
+            self.ensure_indexes()
+            try:
+                with metrics.timed("mongo.analysis_cache_lookup"):
+                    doc = self.col.find_one({"_id": key})
+            except PyMongoError as e:
+                print("Analysis cache lookup failed:", e)
+                doc = None
+            if doc:
+                found = (doc["parsed"], doc.get("rawXml", ""))
+                self._lru_put(key, found[0], found[1], doc.get("createdAt"))
+                with self._lock:
+                    self.mongo_hits += 1
+
+        with self._lock:
+            if found is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        metrics.inc(
+            "legalbuddy_cache_requests_total",
+            cache="analysis",
+            result="miss" if found is None else "hit",
+        )
+        return found
+
+    def set(self, key, parsed: dict, raw_xml: str):
+        created = self._now()
+        self._lru_put(key, parsed, raw_xml, created)
+        if self.col is None:
+            return
+        self.ensure_indexes()
+        try:
+            self.col.replace_one(
+                {"_id": key},
+                {"_id": key, "parsed": parsed, "rawXml": raw_xml, "createdAt": created},
+                upsert=True,
+            )
+        except PyMongoError as e:
+            print("Analysis cache write failed:", e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "mongoHits": self.mongo_hits,
+                "hitRate": (self.hits / total) if total else 0.0,
+                "entries": len(self._lru),
+            }
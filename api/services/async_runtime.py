@@ -0,0 +1,75 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from api.config import Config
+
+_loop = None
+_executors = {}
+_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    from api.services.groq_client import httpx
+
+    return Config.ASYNC_AI_ENABLED and httpx is not None
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """
+    The process-wide AI event loop, running in a daemon thread. Every
+    coroutine that talks to Groq runs here, so the async HTTP client and
+    its connection pool are shared by all requests and jobs.
+    """
+    global _loop
+    with _lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name="ai-loop", daemon=True
+            ).start()
+            _loop = loop
+        return _loop
+
+
+def _get_executor(name: str, max_workers: int) -> ThreadPoolExecutor:
+    with _lock:
+        executor = _executors.get(name)
+        if executor is None:
+            executor = _executors[name] = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix=name
+            )
+        return executor
+
+
+def submit(coro):
+    """
+    Schedule coro on the AI loop from any thread; returns a
+    concurrent.futures.Future. The caller's contextvars (per-request
+    metrics stages) are carried over.
+    """
+    loop = get_loop()
+    return contextvars.copy_context().run(asyncio.run_coroutine_threadsafe, coro, loop)
+
+
+async def _run_in(executor, fn, args, kwargs):
+    call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(executor, call)
+
+
+async def offload(fn, *args, **kwargs):
+    """Run blocking work (Mongo, parsing) on the I/O pool, off the loop."""
+    executor = _get_executor("async-io", Config.ASYNC_IO_WORKERS)
+    return await _run_in(executor, fn, args, kwargs)
+
+
+async def offload_wait(fn, *args, **kwargs):
+    """
+    Like offload, for long blocking waits (MongoLease.wait polls for up to
+    AI_COALESCE_LEASE_SECONDS). They get their own pool so they cannot
+    starve the Mongo calls and parsing on the I/O pool.
+    """
+    executor = _get_executor("async-wait", Config.ASYNC_WAIT_WORKERS)
+    return await _run_in(executor, fn, args, kwargs)
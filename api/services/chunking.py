@@ -0,0 +1,103 @@
+import re
+
+# rough heuristic for llama-style tokenizers on English legal text
+CHARS_PER_TOKEN = 4
+
+# lines that open a new clause/section: "ARTICLE IV", "Section 2.1", "12.", "3.4.1)", "(a)"
+_HEADING_RE = re.compile(
+    r"^\s*(?:(?:article|section|clause|schedule|exhibit|annex)\s+[\w.]+"
+    r"|\d+(?:\.\d+)*[.)]\s+\S"
+    r"|\d+(?:\.\d+)+\s+\S"
+    r"|\([a-z0-9]{1,4}\)\s+\S)",
+    re.IGNORECASE,
+)
+_SENTENCE_END_RE = re.compile(r"(?<=[.;:!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text or "") + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def split_clauses(text: str) -> list:
+    """
+    Split contract text into clauses on section headings and blank lines.
+    """
+    clauses = []
+    current = []
+    for line in (text or "").splitlines():
+        if not line.strip():
+            if current:
+                clauses.append("\n".join(current))
+                current = []
+            continue
+        if current and _HEADING_RE.match(line):
+            clauses.append("\n".join(current))
+            current = []
+        current.append(line)
+    if current:
+        clauses.append("\n".join(current))
+    return clauses
+
+
+def _split_oversized(clause: str, max_tokens: int) -> list:
+    # a single clause over budget: break on sentences, then hard-slice
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    pieces = []
+    buf = ""
+    for sentence in _SENTENCE_END_RE.split(clause):
+        while len(sentence) > max_chars:
+            if buf:
+                pieces.append(buf)
+                buf = ""
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if buf and len(buf) + 1 + len(sentence) > max_chars:
+            pieces.append(buf)
+            buf = sentence
+        else:
+            buf = f"{buf} {sentence}" if buf else sentence
+    if buf:
+        pieces.append(buf)
+    return pieces
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut text to about max_tokens (estimated), preferring a paragraph, line
+    or sentence boundary in the last fifth of the budget over a hard cut.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text or "") <= max_chars:
+        return text
+    head = text[:max_chars]
+    floor = int(max_chars * 0.8)
+    for boundary in ("\n\n", "\n", ". ", " "):
+        cut = head.rfind(boundary, floor)
+        if cut != -1:
+            return head[: cut + len(boundary)].rstrip()
+    return head
+
+
+def chunk_text(text: str, max_tokens: int) -> list:
+    """
+    Pack consecutive clauses into chunks of at most max_tokens (estimated).
+    """
+    chunks = []
+    current = []
+    current_tokens = 0
+    for clause in split_clauses(text):
+        clause_tokens = estimate_tokens(clause)
+        if clause_tokens > max_tokens:
+            if current:
+                chunks.append("\n\n".join(current))
+                current, current_tokens = [], 0
+            chunks.extend(_split_oversized(clause, max_tokens))
+            continue
+        if current and current_tokens + clause_tokens > max_tokens:
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(clause)
+        current_tokens += clause_tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
@@ -1,65 +1,448 @@
+import base64
 import datetime
 
+from bson.errors import InvalidId
 from bson.objectid import ObjectId
+from pymongo import DESCENDING, TEXT, UpdateOne
 
-from api.extensions import db
+from api.config import Config
+from api.extensions import get_db
+from api.services.metrics import metrics
+from api.services.summary_merge import SEVERITY_RANK
+
+
+def encode_cursor(upload_date: str, contract_id) -> str:
+    raw = f"{upload_date}|{contract_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        upload_date, contract_id = raw.rsplit("|", 1)
+        return upload_date, ObjectId(contract_id)
+    except (ValueError, InvalidId) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+
+# fields covered by the search index and their relevance weights
+SEARCH_WEIGHTS = {
+    "title": 10,
+    "summary.risks.title": 8,
+    "summary.risks.description": 3,
+    "summary.keyObligations": 2,
+    "summary.rights": 2,
+}
+
+
+def max_severity_rank(summary: dict) -> int:
+    # 0 when there are no risks; denormalized so severity filters use an index
+    ranks = [
+        SEVERITY_RANK.get(str(r.get("severity") or "").strip().lower(), 0)
+        for r in (summary or {}).get("risks") or []
+        if isinstance(r, dict)
+    ]
+    return max(ranks, default=0)
+
+
+def _risk_counts_expr():
+    risks = {"$ifNull": ["$summary.risks", []]}
+    # normalized like max_severity_rank: models answer "High" as often as "high"
+    severity_expr = {"$toLower": {"$ifNull": ["$$r.severity", ""]}}
+    return {
+        severity: {
+            "$size": {
+                "$filter": {
+                    "input": risks,
+                    "as": "r",
+                    "cond": {"$eq": [severity_expr, severity]},
+                }
+            }
+        }
+        for severity in SEVERITY_RANK
+    }
+
+
+# set by the service only, never from a client's update
+SERVER_FIELDS = frozenset(
+    (
+        "_id",
+        "id",
+        "userId",
+        "version",
+        "updatedAt",
+        "maxSeverityRank",
+        "clauseFingerprints",
+        "findingSources",
+    )
+)
+
+
+def _now_iso() -> str:
+    return datetime.datetime.utcnow().isoformat()
+
+
+def _iso_bound(value: str) -> str:
+    # stored dates are naive UTC isoformat strings, compared as strings
+    try:
+        parsed = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError("Invalid since timestamp")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return parsed.isoformat()
+
+
+def _touch(update: dict) -> dict:
+    # every write bumps version/updatedAt, which drive ETag/Last-Modified
+    update.setdefault("$set", {})["updatedAt"] = _now_iso()
+    update.setdefault("$inc", {})["version"] = 1
+    return update
 
 
 class ContractService:
     def __init__(self):
-        self.col = db["contracts"]
+        self.col = get_db()["contracts"]
 
-    # create: userId is string
-    def create_contract(
-        self, user_id: str, title: str, summary: dict, status: str = "summarized"
+    def ensure_indexes(self):
+        # serves the per-user listing sorted newest first, and its keyset cursor
+        self.col.create_index(
+            [("userId", 1), ("uploadDate", DESCENDING), ("_id", DESCENDING)]
+        )
+        # search: text index scoped per user (userId equality prefix), plus
+        # severity-only filtering without a text query
+        self.col.create_index(
+            [("userId", 1)] + [(field, TEXT) for field in SEARCH_WEIGHTS],
+            weights=SEARCH_WEIGHTS,
+            default_language="english",
+            name="contract_search",
+        )
+        self.col.create_index(
+            [("userId", 1), ("maxSeverityRank", DESCENDING), ("uploadDate", DESCENDING)]
+        )
+
+    def backfill_search_fields(self, batch_size: int = 500) -> int:
+        """
+        Set maxSeverityRank on contracts saved before it existed. The query
+        cannot use an index (a full collection scan), so this is a one-off
+        migration (api.scripts.backfill_search_fields), not part of
+        ensure_indexes. Returns the number of contracts updated.
+        """
+        missing = {"maxSeverityRank": {"$exists": False}}
+        updated = 0
+        while True:
+            docs = list(self.col.find(missing, {"summary.risks": 1}).limit(batch_size))
+            if not docs:
+                return updated
+            self.col.bulk_write(
+                [
+                    UpdateOne(
+                        {"_id": doc["_id"]},
+                        {
+                            "$set": {
+                                "maxSeverityRank": max_severity_rank(doc.get("summary"))
+                            }
+                        },
+                    )
+                    for doc in docs
+                ],
+                ordered=False,
+            )
+            updated += len(docs)
+
+    def _new_doc(
+        self,
+        user_id: str,
+        title: str,
+        summary: dict,
+        status: str,
+        baseline: dict = None,
     ):
+        now = _now_iso()
         doc = {
             "userId": ObjectId(user_id),
             "title": title,
-            "uploadDate": datetime.datetime.utcnow().isoformat(),
+            "uploadDate": now,
+            "updatedAt": now,
+            "version": 1,
             "status": status,
             "summary": summary,
+            "maxSeverityRank": max_severity_rank(summary),
         }
-        res = self.col.insert_one(doc)
-        doc["_id"] = res.inserted_id
-        doc["id"] = str(res.inserted_id)
+        if baseline is not None:
+            # clause hashes only (no text), see revision.make_baseline
+            doc.update(baseline)
+        return doc
+
+    def _to_public(self, doc: dict, user_id: str):
+        doc.pop("clauseFingerprints", None)
+        doc.pop("findingSources", None)
+        doc.pop("maxSeverityRank", None)
+        doc["id"] = str(doc.pop("_id"))
         doc["userId"] = user_id
-        doc.pop("_id", None)
         return doc
 
-    def list_by_user(self, user_id: str):
-        cursor = self.col.find({"userId": ObjectId(user_id)}).sort("uploadDate", -1)
+    # create: userId is string
+    @metrics.stage("mongo.create_contract")
+    def create_contract(
+        self,
+        user_id: str,
+        title: str,
+        summary: dict,
+        status: str = "summarized",
+        baseline: dict = None,
+    ):
+        doc = self._new_doc(user_id, title, summary, status, baseline)
+        res = self.col.insert_one(doc)
+        doc["_id"] = res.inserted_id
+        return self._to_public(doc, user_id)
+
+    @metrics.stage("mongo.create_contracts")
+    def create_contracts(self, user_id: str, items: list):
+        """
+        Insert many contracts in one round trip.
+        items: list of dicts with title, summary and optional status and
+        baseline.
+        """
+        if not items:
+            return []
+        docs = [
+            self._new_doc(
+                user_id,
+                it["title"],
+                it["summary"],
+                it.get("status", "summarized"),
+                it.get("baseline"),
+            )
+            for it in items
+        ]
+        res = self.col.insert_many(docs)
+        for doc, inserted_id in zip(docs, res.inserted_ids):
+            doc["_id"] = inserted_id
+        return [self._to_public(doc, user_id) for doc in docs]
+
+    @metrics.stage("mongo.list_by_user")
+    def list_by_user(self, user_id: str, limit: int = None, cursor: str = None):
+        """
+        One page of a user's contracts, newest first, without summaries.
+        Returns (items, next_cursor); next_cursor is None on the last page.
+        """
+        limit = max(
+            1, min(limit or Config.CONTRACTS_PAGE_SIZE, Config.CONTRACTS_MAX_PAGE_SIZE)
+        )
+        match = {"userId": ObjectId(user_id)}
+        if cursor:
+            upload_date, last_id = decode_cursor(cursor)
+            match["$or"] = [
+                {"uploadDate": {"$lt": upload_date}},
+                {"uploadDate": upload_date, "_id": {"$lt": last_id}},
+            ]
+
+        pipeline = [
+            {"$match": match},
+            {"$sort": {"uploadDate": -1, "_id": -1}},
+            {"$limit": limit + 1},
+            {
+                "$project": {
+                    "title": 1,
+                    "status": 1,
+                    "uploadDate": 1,
+                    "updatedAt": 1,
+                    "version": 1,
+                    "riskCounts": _risk_counts_expr(),
+                }
+            },
+        ]
+        docs = list(self.col.aggregate(pipeline))
+
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            next_cursor = encode_cursor(docs[-1]["uploadDate"], docs[-1]["_id"])
         out = []
-        for c in cursor:
+        for c in docs:
             out.append(
                 {
                     "id": str(c["_id"]),
                     "title": c.get("title"),
                     "status": c.get("status"),
                     "uploadDate": c.get("uploadDate"),
-                    "summary": c.get("summary"),
+                    "updatedAt": c.get("updatedAt") or c.get("uploadDate"),
+                    "version": c.get("version", 0),
+                    "riskCounts": c.get("riskCounts"),
                 }
             )
-        return out
+        return out, next_cursor
 
+    def export_by_user(self, user_id: str, since: str = None, batch_size: int = None):
+        """
+        All of a user's contracts with summaries, oldest first, as a
+        generator over one cursor read EXPORT_BATCH_SIZE documents at a time.
+        since (an ISO timestamp, e.g. the last exported uploadDate) keeps
+        only contracts uploaded after it, for incremental exports.
+        Raises ValueError on a malformed since before anything is read.
+        """
+        match = {"userId": ObjectId(user_id)}
+        if since:
+            match["uploadDate"] = {"$gt": _iso_bound(since)}
+        # the listing index, walked in reverse
+        cursor = self.col.find(
+            match,
+            {"clauseFingerprints": 0, "findingSources": 0, "maxSeverityRank": 0},
+            sort=[("uploadDate", 1), ("_id", 1)],
+            batch_size=batch_size or Config.EXPORT_BATCH_SIZE,
+        )
+        return self._iter_public(cursor, user_id)
+
+    def _iter_public(self, cursor, user_id: str):
+        try:
+            for doc in cursor:
+                yield self._to_public(doc, user_id)
+        finally:
+            cursor.close()
+
+    @metrics.stage("mongo.search")
+    def search(
+        self,
+        user_id: str,
+        query: str = None,
+        min_severity: str = None,
+        limit: int = None,
+        offset: int = 0,
+    ):
+        """
+        Ranked search over the user's contracts. query matches titles,
+        risks, obligations and rights (stemmed, relevance-weighted);
+        min_severity keeps contracts with at least one risk that severe.
+        Returns (items, next_offset); next_offset is None on the last page.
+        """
+        limit = max(
+            1, min(limit or Config.CONTRACTS_PAGE_SIZE, Config.CONTRACTS_MAX_PAGE_SIZE)
+        )
+        offset = max(0, offset or 0)
+        match = {"userId": ObjectId(user_id)}
+        if query:
+            match["$text"] = {"$search": query}
+        if min_severity:
+            rank = SEVERITY_RANK.get(min_severity.strip().lower())
+            if rank is None:
+                raise ValueError(
+                    f"Invalid severity, expected one of: {', '.join(SEVERITY_RANK)}"
+                )
+            match["maxSeverityRank"] = {"$gte": rank}
+
+        pipeline = [{"$match": match}]
+        if query:
+            pipeline += [
+                {"$addFields": {"score": {"$meta": "textScore"}}},
+                {"$sort": {"score": -1, "uploadDate": -1, "_id": -1}},
+            ]
+        else:
+            pipeline.append({"$sort": {"uploadDate": -1, "_id": -1}})
+        pipeline += [
+            {"$skip": offset},
+            {"$limit": limit + 1},
+            {
+                "$project": {
+                    "title": 1,
+                    "status": 1,
+                    "uploadDate": 1,
+                    "score": 1,
+                    "maxSeverityRank": 1,
+                    "riskCounts": _risk_counts_expr(),
+                }
+            },
+        ]
+        docs = list(self.col.aggregate(pipeline))
+
+        next_offset = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            next_offset = offset + limit
+        severity_names = {rank: name for name, rank in SEVERITY_RANK.items()}
+        out = []
+        for c in docs:
+            out.append(
+                {
+                    "id": str(c["_id"]),
+                    "title": c.get("title"),
+                    "status": c.get("status"),
+                    "uploadDate": c.get("uploadDate"),
+                    "riskCounts": c.get("riskCounts"),
+                    "maxSeverity": severity_names.get(c.get("maxSeverityRank")),
+                    "score": c.get("score"),
+                }
+            )
+        return out, next_offset
+
+    @metrics.stage("mongo.get_by_id_and_user")
     def get_by_id_and_user(self, contract_id: str, user_id: str):
         c = self.col.find_one(
             {"_id": ObjectId(contract_id), "userId": ObjectId(user_id)}
         )
         return c
 
+    @metrics.stage("mongo.get_version")
+    def get_version(self, contract_id: str, user_id: str):
+        # cheap precondition check: no summary is read or sent
+        return self.col.find_one(
+            {"_id": ObjectId(contract_id), "userId": ObjectId(user_id)},
+            {"version": 1, "updatedAt": 1, "uploadDate": 1},
+        )
+
+    @metrics.stage("mongo.update_contract")
     def update_contract(self, contract_id: str, updates: dict):
-        result = self.col.update_one({"_id": ObjectId(contract_id)}, {"$set": updates})
+        # clients may PUT back a whole GET response; server-managed fields
+        # would conflict with _touch's $inc (or corrupt userId's type)
+        updates = {k: v for k, v in updates.items() if k not in SERVER_FIELDS}
+        if "summary" in updates:
+            updates = {
+                **updates,
+                "maxSeverityRank": max_severity_rank(updates["summary"]),
+            }
+        result = self.col.update_one(
+            {"_id": ObjectId(contract_id)}, _touch({"$set": updates})
+        )
         return result.modified_count
 
+    @metrics.stage("mongo.delete_contract")
     def delete_contract(self, contract_id: str):
         return self.col.delete_one({"_id": ObjectId(contract_id)}).deleted_count
 
+    @metrics.stage("mongo.set_status")
+    def set_status(self, contract_id: str, status: str, error: str = None):
+        updates = {"status": status}
+        if error:
+            updates["error"] = error
+        self.col.update_one({"_id": ObjectId(contract_id)}, _touch({"$set": updates}))
+
+    @metrics.stage("mongo.get_status")
+    def get_status(self, contract_id: str, user_id: str):
+        return self.col.find_one(
+            {"_id": ObjectId(contract_id), "userId": ObjectId(user_id)},
+            {"status": 1, "error": 1, "uploadDate": 1},
+        )
+
+    @metrics.stage("mongo.attach_summary_and_set_status")
     def attach_summary_and_set_status(
-        self, contract_id: str, summary: dict, status: str
+        self,
+        contract_id: str,
+        summary: dict,
+        status: str,
+        baseline: dict = None,
+        revision: dict = None,
     ):
-        self.col.update_one(
-            {"_id": ObjectId(contract_id)},
-            {"$set": {"summary": summary, "status": status}},
-        )
+        update = {
+            "$set": {
+                "summary": summary,
+                "status": status,
+                "maxSeverityRank": max_severity_rank(summary),
+            }
+        }
+        if baseline is not None:
+            update["$set"].update(baseline)
+        if revision is not None:
+            update["$set"]["lastRevision"] = revision
+            update["$inc"] = {"revisions": 1}
+        self.col.update_one({"_id": ObjectId(contract_id)}, _touch(update))
         return self.col.find_one({"_id": ObjectId(contract_id)})
@@ -1,8 +1,99 @@
-import os
+import asyncio
+import json
+import threading
+import time
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from api.config import Config
+from api.services.metrics import metrics
+from api.services.resilience import CircuitBreaker, TokenBucket, backoff_delay
+
+try:  # optional: only AsyncGroqClient needs a non-blocking HTTP client
+    import httpx
+except ImportError:
+    httpx = None
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class GroqAPIError(RuntimeError):
+    def __init__(self, message: str, status_code: int = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class GroqUnavailableError(RuntimeError):
+    """
+    Raised without calling the provider while the circuit breaker is open
+    or the local rate/concurrency limits cannot be met in time (local=True:
+    those limits are shared by every model).
+    """
+
+    def __init__(self, message: str, local: bool = False):
+        super().__init__(message)
+        self.local = local
+
+
+# ---------- process-wide state shared by every GroqClient ----------
+_session = None
+_session_lock = threading.Lock()
+_concurrency = threading.BoundedSemaphore(Config.GROQ_MAX_CONCURRENCY)
+_bucket = TokenBucket(
+    rate=Config.GROQ_REQUESTS_PER_MINUTE / 60.0,
+    capacity=Config.GROQ_BURST,
+)
+# one breaker per model: an overloaded model must not block its fallbacks
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(model: str) -> CircuitBreaker:
+    with _breakers_lock:
+        breaker = _breakers.get(model)
+        if breaker is None:
+            breaker = _breakers[model] = CircuitBreaker(
+                failure_threshold=Config.GROQ_CIRCUIT_FAILURES,
+                reset_timeout=Config.GROQ_CIRCUIT_RESET_SECONDS,
+            )
+        return breaker
+
+
+def get_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=Config.GROQ_POOL_SIZE,
+                pool_maxsize=Config.GROQ_POOL_SIZE,
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def _retry_after(resp) -> float:
+    value = resp.headers.get("Retry-After") if resp is not None else None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _record_usage(usage):
+    if not usage:
+        return
+    metrics.inc(
+        "legalbuddy_groq_tokens_total", usage.get("prompt_tokens", 0), kind="prompt"
+    )
+    metrics.inc(
+        "legalbuddy_groq_tokens_total",
+        usage.get("completion_tokens", 0),
+        kind="completion",
+    )
 
 
 class GroqClient:
@@ -17,43 +108,280 @@ class GroqClient:
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
         }
+        self.session = get_session()
+        self.max_retries = Config.GROQ_MAX_RETRIES
+
+    def _acquire_rate_slot(self):
+        wait = _bucket.try_reserve(Config.GROQ_QUEUE_TIMEOUT_SECONDS)
+        if wait is None:
+            raise GroqUnavailableError(
+                "Groq rate limit budget exhausted, retry later", local=True
+            )
+        if wait:
+            time.sleep(wait)
+
+    def _retry_delay(self, breaker, resp, error, attempt: int, max_retries: int):
+        """
+        Seconds to wait before retrying a failed attempt (resp: a non-200
+        response, or None after a timeout/connection error); raises
+        GroqAPIError when the failure is final.
+        """
+        if resp is not None and resp.status_code not in RETRYABLE_STATUS:
+            # provider is up, the request itself is bad
+            breaker.record_success()
+            raise GroqAPIError(
+                f"Groq API error: {resp.status_code} - {resp.text}",
+                status_code=resp.status_code,
+            )
+
+        if resp is None or resp.status_code >= 500:
+            breaker.record_failure()
+
+        delay = _retry_after(resp)
+        if delay is None:
+            delay = backoff_delay(
+                attempt,
+                Config.GROQ_RETRY_BASE_SECONDS,
+                Config.GROQ_RETRY_MAX_WAIT_SECONDS,
+            )
+        if attempt >= max_retries or delay > Config.GROQ_RETRY_MAX_WAIT_SECONDS:
+            if resp is None:
+                raise GroqAPIError(f"Groq API request failed: {error}")
+            raise GroqAPIError(
+                f"Groq API error: {resp.status_code} - {resp.text}",
+                status_code=resp.status_code,
+            )
+        if not breaker.allow():
+            raise GroqUnavailableError("Groq API unavailable (circuit open)")
+        return delay
+
+    def _open_breaker(self, model: str) -> CircuitBreaker:
+        breaker = get_breaker(model)
+        if not breaker.allow():
+            raise GroqUnavailableError(
+                f"Groq API unavailable (circuit open), retry in {breaker.retry_in():.0f}s"
+            )
+        return breaker
+
+    def _post(
+        self, payload: dict, timeout: int, stream: bool = False, max_retries=None
+    ):
+        """
+        POST with retries; returns a 200 response or raises.
+        429 and 5xx are retried with jittered exponential backoff, honouring
+        Retry-After; timeouts and connection errors are retried too.
+        """
+        if max_retries is None:
+            max_retries = self.max_retries
+        breaker = self._open_breaker(payload["model"])
+
+        attempt = 0
+        while True:
+            self._acquire_rate_slot()
+            if not _concurrency.acquire(timeout=Config.GROQ_QUEUE_TIMEOUT_SECONDS):
+                raise GroqUnavailableError(
+                    "Too many concurrent Groq requests", local=True
+                )
+            resp = None
+            try:
+                with metrics.timed("groq.request"):
+                    resp = self.session.post(
+                        self.api_url,
+                        headers=self.headers,
+                        json=payload,
+                        timeout=timeout,
+                        stream=stream,
+                    )
+                error = None
+            except (requests.Timeout, requests.ConnectionError) as e:
+                error = e
+            finally:
+                _concurrency.release()
+            metrics.inc(
+                "legalbuddy_groq_requests_total",
+                outcome=resp.status_code if resp is not None else type(error).__name__,
+            )
+
+            if resp is not None and resp.status_code == 200:
+                breaker.record_success()
+                return resp
+
+            try:
+                delay = self._retry_delay(breaker, resp, error, attempt, max_retries)
+            finally:
+                if resp is not None:
+                    resp.close()
+            attempt += 1
+            time.sleep(delay)
+
+    def _chat_payload(self, system_prompt, user_prompt, model, max_tokens):
+        metrics.observe_size("groq_prompt", len(user_prompt))
+        return {
+            "model": model or Config.GROQ_MODEL,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            "max_tokens": max_tokens,
+            "temperature": 1,
+        }
+
+    def _completion_content(self, data: dict) -> str:
+        _record_usage(data.get("usage"))
+        # try to be robust with response shapes
+        choices = data.get("choices")
+        if choices and isinstance(choices, list) and choices:
+            # chat-style
+            content = (
+                choices[0].get("message", {}).get("content")
+                or choices[0].get("text")
+                or ""
+            )
+            metrics.observe_size("groq_completion", len(content))
+            return content
+        # fallback
+        return data.get("text", "")
 
     def chat_completion(
         self,
         system_prompt: str,
         user_prompt: str,
-        model: str = "llama-3.3-70b-versatile",
+        model: str = None,
         max_tokens: int = 3000,
         timeout: int = 30,
+        max_retries: int = None,
     ):
+        payload = self._chat_payload(system_prompt, user_prompt, model, max_tokens)
+        resp = self._post(payload, timeout, max_retries=max_retries)
+        return self._completion_content(resp.json())
+
+    def stream_chat_completion(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        model: str = None,
+        max_tokens: int = 3000,
+        timeout: int = 30,
+        max_retries: int = None,
+    ):
+        """
+        Yields content deltas as the provider streams them (SSE chat API).
+        Retries only apply until the response headers arrive.
+        """
+        payload = self._chat_payload(system_prompt, user_prompt, model, max_tokens)
+        payload["stream"] = True
+        resp = self._post(payload, timeout, stream=True, max_retries=max_retries)
         try:
-            payload = {
-                "model": model,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                "max_tokens": max_tokens,
-                "temperature": 1,
-            }
-            resp = requests.post(
-                self.api_url, headers=self.headers, json=payload, timeout=timeout
-            )
-            if resp.status_code != 200:
-                raise RuntimeError(f"Groq API error: {resp.status_code} - {resp.text}")
-            data = resp.json()
-            # try to be robust with response shapes
-            choices = data.get("choices")
-            if choices and isinstance(choices, list) and choices:
-                # chat-style
-                content = (
-                    choices[0].get("message", {}).get("content")
-                    or choices[0].get("text")
-                    or ""
+            for line in resp.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:") :].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    event = json.loads(data)
+                except ValueError:
+                    continue
+                # Groq reports usage on the final chunk under x_groq
+                _record_usage(
+                    event.get("usage") or (event.get("x_groq") or {}).get("usage")
+                )
+                choices = event.get("choices") or []
+                if not choices:
+                    continue
+                delta = choices[0].get("delta", {}).get("content")
+                if delta:
+                    yield delta
+        finally:
+            resp.close()
+
+
+# ---------- asyncio path (see api.services.async_runtime) ----------
+_async_client = None
+_async_concurrency = None
+
+
+def get_async_client():
+    # created on, and only used from, the shared AI loop
+    global _async_client, _async_concurrency
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=Config.ASYNC_MAX_IN_FLIGHT,
+                max_keepalive_connections=Config.GROQ_POOL_SIZE,
+            )
+        )
+        _async_concurrency = asyncio.Semaphore(Config.ASYNC_MAX_IN_FLIGHT)
+    return _async_client
+
+
+class AsyncGroqClient(GroqClient):
+    """
+    chat_completion as a coroutine on a shared httpx.AsyncClient: a request
+    waiting on Groq holds no thread. Uses the same rate budget, per-model
+    breakers and retry policy as GroqClient; concurrency is capped by
+    ASYNC_MAX_IN_FLIGHT instead of GROQ_MAX_CONCURRENCY.
+    """
+
+    async def _apost(self, payload: dict, timeout: int, max_retries=None):
+        if max_retries is None:
+            max_retries = self.max_retries
+        breaker = self._open_breaker(payload["model"])
+        client = get_async_client()
+
+        attempt = 0
+        while True:
+            wait = _bucket.try_reserve(Config.GROQ_QUEUE_TIMEOUT_SECONDS)
+            if wait is None:
+                raise GroqUnavailableError(
+                    "Groq rate limit budget exhausted, retry later", local=True
+                )
+            if wait:
+                await asyncio.sleep(wait)
+            try:
+                await asyncio.wait_for(
+                    _async_concurrency.acquire(), Config.GROQ_QUEUE_TIMEOUT_SECONDS
                 )
-                return content
-            # fallback
-            return data.get("text", "")
+            except asyncio.TimeoutError:
+                raise GroqUnavailableError(
+                    "Too many concurrent Groq requests", local=True
+                )
+            resp = None
+            try:
+                with metrics.timed("groq.request"):
+                    resp = await client.post(
+                        self.api_url,
+                        headers=self.headers,
+                        json=payload,
+                        timeout=timeout,
+                    )
+                error = None
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                error = e
+            finally:
+                _async_concurrency.release()
+            metrics.inc(
+                "legalbuddy_groq_requests_total",
+                outcome=resp.status_code if resp is not None else type(error).__name__,
+            )
 
-        except Exception as e:
-            print("There was an error calling groq api:", e)
+            if resp is not None and resp.status_code == 200:
+                breaker.record_success()
+                return resp
+
+            delay = self._retry_delay(breaker, resp, error, attempt, max_retries)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def achat_completion(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        model: str = None,
+        max_tokens: int = 3000,
+        timeout: int = 30,
+        max_retries: int = None,
+    ):
+        payload = self._chat_payload(system_prompt, user_prompt, model, max_tokens)
+        resp = await self._apost(payload, timeout, max_retries=max_retries)
+        return self._completion_content(resp.json())
@@ -0,0 +1,70 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from api.config import Config
+from api.services import async_runtime
+
+
+class JobRunner:
+    """
+    Bounded background worker pool.
+    At most max_workers jobs run at once and at most max_queue more wait;
+    submit() fails fast with RuntimeError instead of queueing unboundedly.
+    """
+
+    def __init__(self, max_workers: int = None, max_queue: int = None):
+        self.max_workers = max_workers or Config.JOB_WORKERS
+        self.max_queue = max_queue if max_queue is not None else Config.JOB_QUEUE_MAX
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="contract-job"
+        )
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self._async_slots = threading.BoundedSemaphore(Config.ASYNC_MAX_IN_FLIGHT)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    def submit(self, fn, *args, **kwargs):
+        if not self._slots.acquire(blocking=False):
+            raise RuntimeError("Job queue is full")
+        with self._lock:
+            self._in_flight += 1
+
+        def run():
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                print("Background job failed:", e)
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+                self._slots.release()
+
+        return self.executor.submit(run)
+
+    def submit_coroutine(self, coro_fn, *args, **kwargs):
+        """
+        Run coro_fn(*args, **kwargs) on the AI event loop instead of a
+        worker thread. A job awaiting Groq holds no thread, so up to
+        ASYNC_MAX_IN_FLIGHT of them run at once; beyond that submit fails
+        fast like submit().
+        """
+        if not self._async_slots.acquire(blocking=False):
+            raise RuntimeError("Job queue is full")
+        with self._lock:
+            self._in_flight += 1
+
+        async def run():
+            try:
+                return await coro_fn(*args, **kwargs)
+            except Exception as e:
+                print("Background job failed:", e)
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+                self._async_slots.release()
+
+        return async_runtime.submit(run())
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return self._in_flight
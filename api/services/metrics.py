@@ -0,0 +1,244 @@
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from api.config import Config
+
+# seconds; covers a fast cache hit up to a slow multi-chunk Groq analysis
+LATENCY_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+# bytes / characters
+SIZE_BUCKETS = (1e3, 1e4, 5e4, 1e5, 5e5, 1e6, 5e6, 1e7, 5e7)
+
+HELP = {
+    "legalbuddy_stage_seconds": ("histogram", "Time spent per processing stage"),
+    "legalbuddy_http_request_seconds": ("histogram", "HTTP request latency"),
+    "legalbuddy_http_requests_total": ("counter", "HTTP requests by status"),
+    "legalbuddy_payload_bytes": ("histogram", "Payload sizes by kind"),
+    "legalbuddy_groq_requests_total": ("counter", "Groq API attempts by outcome"),
+    "legalbuddy_groq_tokens_total": ("counter", "Groq tokens reported by the API"),
+    "legalbuddy_cache_requests_total": ("counter", "Cache lookups by result"),
+    "legalbuddy_errors_total": ("counter", "Errors by stage and exception type"),
+    "legalbuddy_model_seconds": ("histogram", "Successful model call latency"),
+    "legalbuddy_model_requests_total": ("counter", "Model calls by outcome"),
+    "legalbuddy_model_fallbacks_total": (
+        "counter",
+        "Calls that moved on to the next model",
+    ),
+    "legalbuddy_prompt_tokens_total": (
+        "counter",
+        "Estimated contract tokens: raw, after normalization, and as prompted",
+    ),
+    "legalbuddy_coalesced_calls_total": (
+        "counter",
+        "Analyses that waited on an identical in-flight call instead of Groq",
+    ),
+}
+
+_NOOP = nullcontext()
+# stage timings and notes of the current request, None outside a request
+_request_stages = contextvars.ContextVar("request_stages", default=None)
+_request_notes = contextvars.ContextVar("request_notes", default=None)
+
+
+def _label_key(labels: dict):
+    # label values are strings, so keys stay sortable in render() even when
+    # callers mix types (e.g. status codes and exception names)
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"'))
+        for k, v in pairs
+    )
+    return "{" + body + "}"
+
+
+def _format_value(value) -> str:
+    # full precision; %g would round large token counters
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Histogram:
+    __slots__ = ("buckets", "count", "counts", "sum")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    Minimal in-process counters and histograms rendered in the Prometheus
+    text format. Every recording call returns immediately when disabled.
+    """
+
+    def __init__(self, enabled: bool = None):
+        self.enabled = Config.METRICS_ENABLED if enabled is None else enabled
+        self._counters = {}  # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> _Histogram
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, buckets=LATENCY_BUCKETS, **labels):
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = _Histogram(buckets)
+            hist.observe(value)
+
+    def observe_size(self, kind: str, size: int):
+        self.observe("legalbuddy_payload_bytes", size, SIZE_BUCKETS, kind=kind)
+
+    def timed(self, stage: str):
+        """
+        Context manager timing one stage. Records the duration, counts
+        exceptions by type and adds the stage to the current request log.
+        """
+        if not self.enabled:
+            return _NOOP
+        return self._timed(stage)
+
+    @contextmanager
+    def _timed(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            self.inc("legalbuddy_errors_total", stage=stage, type=type(e).__name__)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.observe("legalbuddy_stage_seconds", elapsed, stage=stage)
+            stages = _request_stages.get()
+            if stages is not None:
+                # chunk-pool threads add to the same request log
+                with self._lock:
+                    stages[stage] = stages.get(stage, 0.0) + elapsed
+
+    def stage(self, name: str):
+        # decorator form of timed()
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with self._timed(name):
+                    return fn(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def note(self, key: str, value: float):
+        # adds a number (e.g. tokens saved) to the current request log
+        if not self.enabled:
+            return
+        notes = _request_notes.get()
+        if notes is not None:
+            with self._lock:
+                notes[key] = notes.get(key, 0) + value
+
+    def start_request(self):
+        if self.enabled:
+            return _request_stages.set({}), _request_notes.set({})
+        return None
+
+    def finish_request(self, token):
+        """
+        Returns ({stage: seconds}, {note: value}) recorded on this
+        request's thread, or on threads running a copy of its context.
+        """
+        if token is None:
+            return {}, {}
+        stages = _request_stages.get() or {}
+        notes = _request_notes.get() or {}
+        _request_stages.reset(token[0])
+        _request_notes.reset(token[1])
+        return stages, notes
+
+    def render(self) -> str:
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(
+                (key, (h.buckets, list(h.counts), h.sum, h.count))
+                for key, h in self._histograms.items()
+            )
+
+        lines = []
+        seen = set()
+
+        def header(name):
+            if name in seen:
+                return
+            seen.add(name)
+            kind, text = HELP.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in counters:
+            header(name)
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        for (name, labels), (buckets, counts, total, count) in histograms:
+            header(name)
+            cumulative = 0
+            for bound, n in zip(buckets, counts):
+                cumulative += n
+                le = _format_labels(labels, [("le", f"{bound:g}")])
+                lines.append(f"{name}_bucket{le} {cumulative}")
+            le = _format_labels(labels, [("le", "+Inf")])
+            lines.append(f"{name}_bucket{le} {count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,212 @@
+import statistics
+import threading
+import time
+from collections import deque
+
+from api.config import Config
+from api.services.groq_client import GroqAPIError, GroqUnavailableError
+from api.services.metrics import metrics
+
+# provider-side trouble worth trying another model for
+FALLBACK_STATUS = {408, 429, 500, 502, 503, 504}
+# latency comparisons need a few samples per model
+_MIN_SAMPLES = 5
+
+
+def parse_models(value: str) -> list:
+    return [m.strip() for m in (value or "").split(",") if m.strip()]
+
+
+def is_fallback_error(error: Exception) -> bool:
+    if isinstance(error, GroqUnavailableError):
+        # local rate/concurrency limits would stop every model alike
+        return not error.local
+    if isinstance(error, GroqAPIError):
+        # no status: timeout or connection error after retries
+        return error.status_code is None or error.status_code in FALLBACK_STATUS
+    return False
+
+
+class ModelRouter:
+    """
+    Picks the model order for each task ("summary", "detailed") from the
+    routing table in Config, using rolling per-model statistics:
+    - a model that just failed with 429/5xx/timeout cools down for
+      cooldown_seconds, and one whose recent error rate is above
+      max_error_rate is tried last;
+    - among healthy models the first listed wins, unless an alternate's
+      median latency for that task is latency_slack times lower.
+    """
+
+    def __init__(self, routes: dict = None):
+        self.routes = routes or {
+            "summary": parse_models(Config.AI_SUMMARY_MODELS),
+            "detailed": parse_models(Config.AI_DETAILED_MODELS),
+        }
+        self.window = Config.AI_MODEL_STATS_WINDOW
+        self.cooldown_seconds = Config.AI_MODEL_COOLDOWN_SECONDS
+        self.max_error_rate = Config.AI_MODEL_MAX_ERROR_RATE
+        self.latency_slack = Config.AI_MODEL_LATENCY_SLACK
+        self._outcomes = {}  # model -> deque of bools (True = success)
+        self._latencies = {}  # (task, model) -> deque of seconds
+        self._cooldown_until = {}  # model -> monotonic deadline
+        self._lock = threading.Lock()
+
+    def models(self, task: str) -> list:
+        models = self.routes.get(task) or []
+        return models or [Config.GROQ_MODEL]
+
+    def primary(self, task: str) -> str:
+        return self.models(task)[0]
+
+    def _error_rate(self, model: str) -> float:
+        outcomes = self._outcomes.get(model)
+        if not outcomes:
+            return 0.0
+        return outcomes.count(False) / len(outcomes)
+
+    def _median_latency(self, task: str, model: str):
+        samples = self._latencies.get((task, model))
+        if not samples or len(samples) < _MIN_SAMPLES:
+            return None
+        return statistics.median(samples)
+
+    def order(self, task: str) -> list:
+        """Models to try for task, best first; unhealthy ones go last."""
+        now = time.monotonic()
+        with self._lock:
+            healthy, degraded = [], []
+            for model in self.models(task):
+                cooling = self._cooldown_until.get(model, 0) > now
+                if cooling or self._error_rate(model) > self.max_error_rate:
+                    degraded.append(model)
+                else:
+                    healthy.append(model)
+
+            if len(healthy) > 1:
+                first = self._median_latency(task, healthy[0])
+                for alt in healthy[1:]:
+                    latency = self._median_latency(task, alt)
+                    if first and latency and latency * self.latency_slack < first:
+                        healthy.remove(alt)
+                        healthy.insert(0, alt)
+                        break
+        return healthy + degraded
+
+    def _outcome_window(self, model: str) -> deque:
+        window = self._outcomes.get(model)
+        if window is None:
+            window = self._outcomes[model] = deque(maxlen=self.window)
+        return window
+
+    def record_success(self, task: str, model: str, seconds: float):
+        with self._lock:
+            self._outcome_window(model).append(True)
+            key = (task, model)
+            if key not in self._latencies:
+                self._latencies[key] = deque(maxlen=self.window)
+            self._latencies[key].append(seconds)
+            self._cooldown_until.pop(model, None)
+        metrics.observe("legalbuddy_model_seconds", seconds, task=task, model=model)
+        metrics.inc(
+            "legalbuddy_model_requests_total", task=task, model=model, outcome="ok"
+        )
+
+    def record_failure(self, task: str, model: str, error: Exception):
+        with self._lock:
+            self._outcome_window(model).append(False)
+            self._cooldown_until[model] = time.monotonic() + self.cooldown_seconds
+        metrics.inc(
+            "legalbuddy_model_requests_total",
+            task=task,
+            model=model,
+            outcome=type(error).__name__,
+        )
+
+    def _failed(self, task: str, model: str, error: Exception, has_alternate: bool):
+        if not is_fallback_error(error):
+            raise error
+        self.record_failure(task, model, error)
+        if has_alternate:
+            metrics.inc("legalbuddy_model_fallbacks_total", task=task, model=model)
+
+    def call(self, task: str, fn):
+        """
+        Runs fn(model, max_retries) on the routed models until one succeeds.
+        Only 429/5xx/timeouts fall through to the next model; models with
+        an alternate after them get fewer client-side retries so fallback
+        happens quickly. Returns (model, result).
+        """
+        models = self.order(task)
+        last_error = None
+        for i, model in enumerate(models):
+            has_alternate = i < len(models) - 1
+            retries = Config.AI_FALLBACK_RETRIES if has_alternate else None
+            start = time.perf_counter()
+            try:
+                result = fn(model, retries)
+            except Exception as e:
+                self._failed(task, model, e, has_alternate)
+                last_error = e
+                continue
+            self.record_success(task, model, time.perf_counter() - start)
+            return model, result
+        raise last_error
+
+    def stream(self, task: str, fn):
+        """
+        call() for a generator function fn(model, max_retries): its items
+        are passed through as they arrive. fn must not fall back once it
+        has yielded (raise a non-fallback error instead). Returns
+        (model, fn's return value) to `yield from`.
+        """
+        models = self.order(task)
+        last_error = None
+        for i, model in enumerate(models):
+            has_alternate = i < len(models) - 1
+            retries = Config.AI_FALLBACK_RETRIES if has_alternate else None
+            start = time.perf_counter()
+            try:
+                result = yield from fn(model, retries)
+            except Exception as e:
+                self._failed(task, model, e, has_alternate)
+                last_error = e
+                continue
+            self.record_success(task, model, time.perf_counter() - start)
+            return model, result
+        raise last_error
+
+    async def acall(self, task: str, fn):
+        """call() for a coroutine function fn(model, max_retries)."""
+        models = self.order(task)
+        last_error = None
+        for i, model in enumerate(models):
+            has_alternate = i < len(models) - 1
+            retries = Config.AI_FALLBACK_RETRIES if has_alternate else None
+            start = time.perf_counter()
+            try:
+                result = await fn(model, retries)
+            except Exception as e:
+                self._failed(task, model, e, has_alternate)
+                last_error = e
+                continue
+            self.record_success(task, model, time.perf_counter() - start)
+            return model, result
+        raise last_error
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            out = {}
+            for task in self.routes:
+                out[task] = [
+                    {
+                        "model": model,
+                        "errorRate": round(self._error_rate(model), 3),
+                        "medianSeconds": self._median_latency(task, model),
+                        "coolingDown": self._cooldown_until.get(model, 0) > now,
+                    }
+                    for model in self.models(task)
+                ]
+        out["order"] = {task: self.order(task) for task in self.routes}
+        return out
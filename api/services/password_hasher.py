@@ -0,0 +1,65 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from api.config import Config
+
+
+class HasherOverloaded(RuntimeError):
+    pass
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a small dedicated pool so a burst of logins cannot
+    occupy every request worker and CPU core. At most `workers` hashes run
+    at once and `max_queue` more may wait; beyond that callers get
+    HasherOverloaded immediately.
+    """
+
+    def __init__(self, rounds: int = None, workers: int = None, max_queue: int = None):
+        self.rounds = rounds or Config.BCRYPT_ROUNDS
+        workers = workers or Config.BCRYPT_WORKERS
+        max_queue = max_queue if max_queue is not None else Config.BCRYPT_QUEUE_MAX
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="bcrypt"
+        )
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherOverloaded("Authentication is busy, retry shortly")
+        try:
+            future = self.executor.submit(fn, *args)
+        except RuntimeError:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def hash(self, password: str) -> str:
+        hashed = self._run(
+            bcrypt.hashpw, password.encode("utf-8"), bcrypt.gensalt(self.rounds)
+        )
+        return hashed.decode("utf-8")
+
+    def verify(self, password: str, hashed: str) -> bool:
+        try:
+            return self._run(
+                bcrypt.checkpw, password.encode("utf-8"), hashed.encode("utf-8")
+            )
+        except HasherOverloaded:
+            raise
+        except Exception:
+            return False
+
+    def needs_rehash(self, hashed: str) -> bool:
+        # bcrypt hashes look like $2b$<cost>$<salt+hash>
+        try:
+            return int(hashed.split("$")[2]) != self.rounds
+        except (AttributeError, IndexError, ValueError):
+            return False
+
+
+password_hasher = PasswordHasher()
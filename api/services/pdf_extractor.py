@@ -0,0 +1,187 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+from api.config import Config
+from api.services.text_normalizer import PAGE_BREAK
+
+_pool = None
+_pool_unavailable = False
+_pool_lock = threading.Lock()
+
+
+def _mp_context():
+    # never fork: the pool is created from a request thread of a process
+    # that already runs other threads (AI loop, pymongo monitors, pools),
+    # and a forked child can deadlock on locks held at fork time.
+    # forkserver forks from a clean single-threaded server instead.
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload(["pypdf", __name__])
+        return ctx
+    return multiprocessing.get_context("spawn")
+
+
+def _get_pool():
+    global _pool, _pool_unavailable
+    with _pool_lock:
+        if _pool is None and not _pool_unavailable and Config.PDF_WORKERS > 1:
+            try:
+                _pool = ProcessPoolExecutor(
+                    max_workers=Config.PDF_WORKERS, mp_context=_mp_context()
+                )
+            except (OSError, NotImplementedError, ValueError) as e:
+                # e.g. no /dev/shm on some serverless runtimes
+                print("PDF process pool unavailable, extracting serially:", e)
+                _pool_unavailable = True
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        _pool = None
+
+
+def _open(source):
+    # bytes, a file path, or a seekable binary stream such as an mmap
+    import pypdf
+
+    if isinstance(source, (bytes, bytearray)):
+        source = BytesIO(source)
+    return pypdf.PdfReader(source)
+
+
+def _extract_pages(source, start: int, stop: int) -> list:
+    # runs in a worker process; source is a file path there
+    reader = _open(source)
+    pages = []
+    for i in range(start, min(stop, len(reader.pages))):
+        try:
+            pages.append(reader.pages[i].extract_text() or "")
+        except Exception:
+            pages.append("")
+    return pages
+
+
+def _extract_serial(reader, page_count: int, deadline: float, char_budget: int):
+    pages = []
+    collected = 0
+    for i in range(page_count):
+        if time.monotonic() > deadline or collected >= char_budget:
+            break
+        try:
+            text = reader.pages[i].extract_text() or ""
+        except Exception:
+            text = ""
+        pages.append(text)
+        collected += len(text)
+    return pages
+
+
+def _extract_parallel(path: str, page_count: int, deadline: float, char_budget: int):
+    pool = _get_pool()
+    step = Config.PDF_PAGES_PER_TASK
+    ranges = [(s, min(s + step, page_count)) for s in range(0, page_count, step)]
+    max_in_flight = Config.PDF_WORKERS * 2
+
+    results = {}  # range index -> list of page texts
+    in_flight = {}
+    next_submit = 0
+    next_flush = 0
+    collected = 0  # chars in the contiguous, page-ordered prefix
+    try:
+        while next_flush < len(ranges):
+            while next_submit < len(ranges) and len(in_flight) < max_in_flight:
+                start, stop = ranges[next_submit]
+                in_flight[pool.submit(_extract_pages, path, start, stop)] = next_submit
+                next_submit += 1
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, _ = wait(in_flight, timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                idx = in_flight.pop(future)
+                try:
+                    results[idx] = future.result()
+                except BrokenProcessPool:
+                    raise
+                except Exception:
+                    start, stop = ranges[idx]
+                    results[idx] = [""] * (stop - start)
+
+            while next_flush in results:
+                collected += sum(len(p) for p in results[next_flush])
+                next_flush += 1
+            if collected >= char_budget:
+                break
+    finally:
+        # cancel() only stops ranges still queued; a range already running
+        # keeps its worker until its PDF_PAGES_PER_TASK pages are done, so
+        # a deadline frees the pool at most one task later
+        for future in in_flight:
+            future.cancel()
+
+    # partial results: every finished range, in page order
+    pages = []
+    for idx in sorted(results):
+        pages.extend(results[idx])
+    return pages
+
+
+def _write_temp(content) -> str:
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    with os.fdopen(fd, "wb") as f:
+        if isinstance(content, BytesIO):
+            with content.getbuffer() as view:
+                f.write(view)
+        else:
+            f.write(content)
+    return path
+
+
+def extract_pdf_text(
+    content,
+    max_pages: int = None,
+    time_budget: float = None,
+    char_budget: int = None,
+    path: str = None,
+) -> str:
+    """
+    Extract text from a PDF, page-parallel on a process pool for large
+    documents. Stops at max_pages, after time_budget seconds, or once
+    char_budget characters (the most the AI step can use) are collected.
+    content is bytes or a seekable stream (BytesIO, mmap); path, when the
+    document is already on disk, is handed to the workers as is.
+    """
+    max_pages = max_pages or Config.PDF_MAX_PAGES
+    deadline = time.monotonic() + (time_budget or Config.PDF_TIME_BUDGET_SECONDS)
+    char_budget = char_budget or Config.PDF_CHAR_BUDGET
+
+    reader = _open(content)
+    page_count = min(len(reader.pages), max_pages)
+    if page_count < Config.PDF_PARALLEL_MIN_PAGES or _get_pool() is None:
+        return PAGE_BREAK.join(
+            _extract_serial(reader, page_count, deadline, char_budget)
+        )
+
+    # workers read the document from disk instead of each getting a copy
+    temp_path = None if path else _write_temp(content)
+    try:
+        pages = _extract_parallel(path or temp_path, page_count, deadline, char_budget)
+    except BrokenProcessPool as e:
+        print("PDF process pool broke, extracting serially:", e)
+        _reset_pool()
+        pages = _extract_serial(reader, page_count, deadline, char_budget)
+    finally:
+        if temp_path:
+            os.unlink(temp_path)
+    return PAGE_BREAK.join(pages)
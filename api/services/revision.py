@@ -0,0 +1,140 @@
+import hashlib
+import re
+from difflib import SequenceMatcher
+
+from api.services.chunking import estimate_tokens, split_clauses
+from api.services.summary_merge import risk_key
+from api.services.text_normalizer import normalize_contract_text
+
+# 64 bits per clause is plenty to tell clauses of one contract apart
+FINGERPRINT_HEX_CHARS = 16
+# a risk is attributed to clauses containing at least this share of the
+# words in its title and description
+MIN_ATTRIBUTION_OVERLAP = 0.5
+MAX_SOURCES_PER_FINDING = 3
+
+_WORD_RE = re.compile(r"[a-z0-9]{4,}")
+
+
+def fingerprint(clause: str) -> str:
+    # whitespace and case edits are not revisions
+    normalized = re.sub(r"\s+", " ", clause).strip().lower()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[
+        :FINGERPRINT_HEX_CHARS
+    ]
+
+
+def clause_fingerprints(text: str):
+    """
+    Returns (clauses, fingerprints) in document order. Text is normalized
+    first so re-paginated headers and page numbers do not look like edits.
+    """
+    clauses = split_clauses(normalize_contract_text(text)[0])
+    return clauses, [fingerprint(c) for c in clauses]
+
+
+def _words(text) -> set:
+    return set(_WORD_RE.findall(str(text or "").lower()))
+
+
+def attribute_findings(summary: dict, clauses: list, fingerprints: list) -> dict:
+    """
+    Map each risk (by risk_key) to the fingerprints of the clauses it most
+    likely came from, by word overlap with the risk's title and description.
+    Risks without a clear source (e.g. about something the contract lacks)
+    are left out, so no clause edit ever makes them stale.
+    """
+    clause_words = [_words(c) for c in clauses]
+    sources = {}
+    for risk in (summary or {}).get("risks") or []:
+        key = risk_key(risk)
+        words = _words(f"{risk.get('title') or ''} {risk.get('description') or ''}")
+        if not key or not words:
+            continue
+        scores = sorted(
+            ((len(words & cw) / len(words), i) for i, cw in enumerate(clause_words)),
+            reverse=True,
+        )
+        if not scores or scores[0][0] < MIN_ATTRIBUTION_OVERLAP:
+            continue
+        best = scores[0][0]
+        sources[key] = [
+            fingerprints[i]
+            for score, i in scores[:MAX_SOURCES_PER_FINDING]
+            if score >= best * 0.8
+        ]
+    return sources
+
+
+def make_baseline(clauses: list, fingerprints: list, summary: dict) -> dict:
+    """
+    What the next revision is diffed against: clause fingerprints and the
+    source clauses of each finding. Hashes only, never the text.
+    """
+    return {
+        "clauseFingerprints": fingerprints,
+        "findingSources": attribute_findings(summary, clauses, fingerprints),
+    }
+
+
+def revision_baseline(text: str, summary: dict) -> dict:
+    clauses, fingerprints = clause_fingerprints(text)
+    return make_baseline(clauses, fingerprints, summary)
+
+
+class RevisionDiff:
+    """
+    Clause-level diff of a new version against the fingerprints stored
+    for the previous one. Only fingerprints of the old version are needed.
+    """
+
+    def __init__(self, old_fingerprints: list, clauses: list, fingerprints: list):
+        self.clauses = clauses
+        self.fingerprints = fingerprints
+        self.changed = []  # indexes into clauses
+        self.added = []
+        self.removed = 0
+        self.unchanged = 0
+
+        matcher = SequenceMatcher(None, old_fingerprints, fingerprints, autojunk=False)
+        for op, i1, i2, j1, j2 in matcher.get_opcodes():
+            if op == "equal":
+                self.unchanged += i2 - i1
+            elif op == "replace":
+                self.changed.extend(range(j1, j2))
+                self.removed += max(0, (i2 - i1) - (j2 - j1))
+            elif op == "insert":
+                self.added.extend(range(j1, j2))
+            elif op == "delete":
+                self.removed += i2 - i1
+
+    def touched_clauses(self) -> list:
+        # changed and new clauses in document order: the only text re-analyzed
+        return [self.clauses[i] for i in sorted(self.changed + self.added)]
+
+    def stale_findings(self, summary: dict, sources: dict) -> set:
+        """
+        risk_keys of previous findings whose source clauses were changed or
+        removed in this version. Findings saved without sources (before
+        they were recorded) are judged by where they best match now.
+        """
+        sources = sources or {}
+        current = set(self.fingerprints)
+        stale = {key for key, fps in sources.items() if not current.issuperset(fps)}
+        touched = {self.fingerprints[i] for i in self.changed + self.added}
+        matched = attribute_findings(summary, self.clauses, self.fingerprints)
+        for key, fps in matched.items():
+            if key not in sources and touched.intersection(fps):
+                stale.add(key)
+        return stale
+
+    def stats(self) -> dict:
+        touched = self.touched_clauses()
+        return {
+            "unchangedClauses": self.unchanged,
+            "changedClauses": len(self.changed),
+            "addedClauses": len(self.added),
+            "removedClauses": self.removed,
+            "tokensAnalyzed": sum(estimate_tokens(c) for c in touched),
+            "tokensTotal": sum(estimate_tokens(c) for c in self.clauses),
+        }
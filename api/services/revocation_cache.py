@@ -0,0 +1,122 @@
+import datetime
+import threading
+import time
+
+from pymongo.errors import PyMongoError
+
+from api.config import Config
+from api.extensions import get_db
+
+
+class RevocationCache:
+    """
+    In-process set of revoked token jtis, so the JWT blocklist check does
+    not hit Mongo on every request.
+    The set is refreshed incrementally from token_blacklist (by revokedAt)
+    at most every REVOCATION_REFRESH_SECONDS, which bounds how long a
+    logout on another instance takes to apply here.
+    Until one refresh has succeeded there is nothing safe to fall back
+    on, so every token counts as revoked (fails closed) while Mongo is
+    unreachable; after that a failed refresh keeps serving the last set.
+    """
+
+    def __init__(self, refresh_seconds: float = None, overlap_seconds: float = None):
+        self._col = None
+        self.refresh_seconds = (
+            refresh_seconds
+            if refresh_seconds is not None
+            else Config.REVOCATION_REFRESH_SECONDS
+        )
+        # re-read a window before the watermark to absorb clock skew and
+        # inserts that committed after our last read
+        self.overlap = datetime.timedelta(
+            seconds=overlap_seconds
+            if overlap_seconds is not None
+            else Config.REVOCATION_SYNC_OVERLAP_SECONDS
+        )
+        self._revoked = {}  # jti -> expiry (unix ts) or None
+        self._watermark = None
+        self._next_refresh = 0.0
+        self._synced = False
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    @property
+    def col(self):
+        if self._col is None:
+            self._col = get_db()["token_blacklist"]
+        return self._col
+
+    def add(self, jti: str, expires_at_ts: int = None):
+        with self._lock:
+            self._revoked[jti] = expires_at_ts
+
+    def is_revoked(self, jti: str) -> bool:
+        self._maybe_refresh()
+        with self._lock:
+            return not self._synced or jti in self._revoked
+
+    def _maybe_refresh(self):
+        if time.monotonic() < self._next_refresh:
+            return
+        # one refresher at a time; others keep answering from the current
+        # set, or wait for the first sync when there is none yet
+        if not self._refresh_lock.acquire(blocking=not self._synced):
+            return
+        try:
+            if time.monotonic() < self._next_refresh:
+                return
+            self.refresh()
+        finally:
+            self._refresh_lock.release()
+
+    def refresh(self):
+        query = {}
+        if self._watermark:
+            since = datetime.datetime.fromisoformat(self._watermark) - self.overlap
+            query = {"revokedAt": {"$gte": since.isoformat()}}
+        try:
+            docs = list(
+                self.col.find(
+                    query, {"_id": 0, "jti": 1, "revokedAt": 1, "expiresAt": 1}
+                )
+            )
+        except PyMongoError as e:
+            print("Could not refresh token revocations:", e)
+            if self._synced:
+                # keep serving the last known set, try again next interval
+                self._next_refresh = time.monotonic() + self.refresh_seconds
+            return
+
+        now = time.time()
+        with self._lock:
+            for doc in docs:
+                jti = doc.get("jti")
+                if not jti:
+                    continue
+                self._revoked[jti] = _to_timestamp(doc.get("expiresAt"))
+                revoked_at = doc.get("revokedAt")
+                if revoked_at and (not self._watermark or revoked_at > self._watermark):
+                    self._watermark = revoked_at
+            # expired tokens are rejected by signature checks anyway
+            for jti, exp in list(self._revoked.items()):
+                if exp is not None and exp < now:
+                    del self._revoked[jti]
+            self._synced = True
+        self._next_refresh = time.monotonic() + self.refresh_seconds
+
+
+def _to_timestamp(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+        return value.timestamp()
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+revocation_cache = RevocationCache()
@@ -0,0 +1,177 @@
+import asyncio
+import copy
+import datetime
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+from api.config import Config
+from api.extensions import get_db
+from api.services.metrics import metrics
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key within this process: the
+    first caller (the leader) runs the work, callers arriving while it is
+    in flight wait for it and get a copy of its result or its exception.
+    Thread callers (do) and coroutines on the AI loop (ado) share flights.
+    """
+
+    def __init__(self):
+        self._flights = {}  # key -> concurrent.futures.Future
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def _join(self, key: str):
+        # returns (future, is_leader)
+        with self._lock:
+            future = self._flights.get(key)
+            if future is not None:
+                self.coalesced += 1
+                metrics.inc("legalbuddy_coalesced_calls_total", scope="process")
+                return future, False
+            future = self._flights[key] = Future()
+            return future, True
+
+    def _settle(self, key: str, future: Future, result=None, error=None):
+        with self._lock:
+            self._flights.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            # the leader's caller owns `result`; waiters copy from a snapshot
+            future.set_result(copy.deepcopy(result))
+
+    def do(self, key: str, fn):
+        future, leader = self._join(key)
+        if not leader:
+            # followers may mutate the summary before saving it
+            return copy.deepcopy(future.result())
+        try:
+            result = fn()
+        except BaseException as e:
+            self._settle(key, future, error=e)
+            raise
+        self._settle(key, future, result)
+        return result
+
+    async def ado(self, key: str, coro_fn):
+        future, leader = self._join(key)
+        if not leader:
+            return copy.deepcopy(await asyncio.wrap_future(future))
+        try:
+            result = await coro_fn()
+        except BaseException as e:
+            self._settle(key, future, error=e)
+            raise
+        self._settle(key, future, result)
+        return result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+
+class MongoLease:
+    """
+    Cross-instance half of coalescing: a lease document per key in the
+    analysis_leases collection marks an analysis as running somewhere.
+    Other instances wait for the result to appear in the shared analysis
+    cache (or for the error the leader recorded) instead of calling Groq.
+    A TTL index clears the leases of instances that died mid-analysis.
+    """
+
+    def __init__(self, lease_seconds: float = None, poll_seconds: float = None):
+        self.lease_seconds = lease_seconds or Config.AI_COALESCE_LEASE_SECONDS
+        self.poll_seconds = poll_seconds or Config.AI_COALESCE_POLL_SECONDS
+        self.col = get_db()["analysis_leases"]
+        self.owner = uuid.uuid4().hex
+        self._indexes_ready = False
+
+    def ensure_indexes(self):
+        if self._indexes_ready:
+            return
+        try:
+            self.col.create_index("expiresAt", expireAfterSeconds=0)
+            self._indexes_ready = True
+        except PyMongoError as e:
+            print("Could not create analysis lease index:", e)
+
+    def _now(self):
+        return datetime.datetime.utcnow()
+
+    def acquire(self, key: str) -> bool:
+        """True when this instance should run the analysis for key."""
+        self.ensure_indexes()
+        now = self._now()
+        lease = {
+            "_id": key,
+            "owner": self.owner,
+            "expiresAt": now + datetime.timedelta(seconds=self.lease_seconds),
+        }
+        try:
+            self.col.insert_one(lease)
+            return True
+        except DuplicateKeyError:
+            pass
+        except PyMongoError as e:
+            # coalescing is an optimization: analyze rather than fail
+            print("Analysis lease unavailable:", e)
+            return True
+        # the TTL monitor runs about once a minute; take over stale leases
+        try:
+            if self.col.delete_one(
+                {"_id": key, "expiresAt": {"$lt": now}}
+            ).deleted_count:
+                self.col.insert_one(lease)
+                return True
+        except PyMongoError:
+            pass
+        return False
+
+    def release(self, key: str, error: Exception = None):
+        try:
+            if error is None:
+                self.col.delete_one({"_id": key, "owner": self.owner})
+                return
+            # keep the lease briefly so waiting instances see the failure
+            self.col.update_one(
+                {"_id": key, "owner": self.owner},
+                {
+                    "$set": {
+                        "error": str(error),
+                        "expiresAt": self._now()
+                        + datetime.timedelta(seconds=self.poll_seconds * 4),
+                    }
+                },
+            )
+        except PyMongoError as e:
+            print("Could not release analysis lease:", e)
+
+    def wait(self, key: str, lookup):
+        """
+        Wait while another instance holds the lease for key. Returns
+        lookup(key) (the cached result) once it is released, or None when
+        the lease went stale or was released without a result, in which
+        case the caller should analyze itself.
+        """
+        deadline = time.monotonic() + self.lease_seconds
+        while time.monotonic() < deadline:
+            try:
+                lease = self.col.find_one({"_id": key})
+            except PyMongoError:
+                return None
+            if lease is None or lease["expiresAt"] < self._now():
+                found = lookup(key)
+                if found is not None:
+                    metrics.inc("legalbuddy_coalesced_calls_total", scope="cluster")
+                return found
+            if lease.get("error"):
+                metrics.inc("legalbuddy_coalesced_calls_total", scope="cluster")
+                raise RuntimeError(f"AI call failed: {lease['error']}")
+            time.sleep(self.poll_seconds)
+        return None
@@ -0,0 +1,81 @@
+import re
+
+SEVERITY_RANK = {"low": 1, "medium": 2, "high": 3, "critical": 4}
+
+
+def _norm(value) -> str:
+    return re.sub(r"[\W_]+", " ", str(value or "")).strip().lower()
+
+
+def _dedupe(items) -> list:
+    seen = set()
+    out = []
+    for item in items:
+        key = _norm(item)
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        out.append(item)
+    return out
+
+
+def risk_key(risk: dict) -> str:
+    # what makes two risks "the same" across chunks and revisions
+    return _norm(risk.get("title")) or _norm(risk.get("description"))
+
+
+def drop_risks(summary: dict, keys) -> dict:
+    """Copy of summary without the risks whose risk_key is in keys."""
+    if not keys:
+        return summary
+    return {
+        **summary,
+        "risks": [r for r in summary.get("risks") or [] if risk_key(r) not in keys],
+    }
+
+
+def merge_summaries(parts: list, title: str = None, prefer_later: bool = False) -> dict:
+    """
+    Merge parsed summaries (XMLParser.parse_summary output) into one.
+    Duplicate obligations, rights, edits and risks are dropped; a duplicate
+    risk keeps the highest severity seen, or with prefer_later (a revision
+    merged over the previous summary) is replaced by the later part's
+    entry, so severities can go down. Risk ids are renumbered from 1.
+    """
+    merged_title = title or ""
+    obligations, rights, edits = [], [], []
+    risks = {}
+    for part in parts:
+        if not part:
+            continue
+        merged_title = merged_title or part.get("title") or ""
+        obligations.extend(part.get("keyObligations") or [])
+        rights.extend(part.get("rights") or [])
+        edits.extend(part.get("suggestedEdits") or [])
+        for risk in part.get("risks") or []:
+            key = risk_key(risk)
+            if not key:
+                continue
+            existing = risks.get(key)
+            if existing is None or prefer_later:
+                risks[key] = dict(risk)
+                continue
+            new_rank = SEVERITY_RANK.get(_norm(risk.get("severity")), 0)
+            old_rank = SEVERITY_RANK.get(_norm(existing.get("severity")), 0)
+            if new_rank > old_rank:
+                existing["severity"] = risk.get("severity")
+            if not existing.get("description"):
+                existing["description"] = risk.get("description")
+
+    merged_risks = []
+    for i, risk in enumerate(risks.values(), start=1):
+        risk["id"] = str(i)
+        merged_risks.append(risk)
+
+    return {
+        "title": merged_title,
+        "keyObligations": _dedupe(obligations),
+        "risks": merged_risks,
+        "suggestedEdits": _dedupe(edits),
+        "rights": _dedupe(rights),
+    }
@@ -0,0 +1,89 @@
+import threading
+import time
+from collections import OrderedDict
+
+from api.config import Config
+from api.services.metrics import metrics
+
+
+class TextCache:
+    """
+    In-process cache of extracted contract text keyed by the sha256 of the
+    uploaded file bytes (SpooledUpload.digest). Entries expire after
+    ttl_seconds and the least recently used ones are evicted once the total
+    text size passes max_bytes. Raw text never leaves the process, so a
+    text handle only resolves on the instance that extracted it.
+    """
+
+    def __init__(self, max_bytes: int = None, ttl_seconds: int = None):
+        self.max_bytes = max_bytes or Config.TEXT_CACHE_MAX_BYTES
+        self.ttl_seconds = ttl_seconds or Config.TEXT_CACHE_TTL_SECONDS
+        self._entries = OrderedDict()  # digest -> (text, expires_at, owners)
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _drop(self, digest):
+        text, _, _ = self._entries.pop(digest)
+        self._size -= len(text)
+
+    def get(self, digest: str, owner: str = None):
+        """
+        Cached text for digest, or None. With owner set, only entries that
+        owner has uploaded are returned (used for text handles).
+        """
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None and entry[1] < time.monotonic():
+                self._drop(digest)
+                entry = None
+            if entry is None or (owner is not None and owner not in entry[2]):
+                self.misses += 1
+                entry = None
+            else:
+                self._entries.move_to_end(digest)
+                self.hits += 1
+        metrics.inc(
+            "legalbuddy_cache_requests_total",
+            cache="text",
+            result="miss" if entry is None else "hit",
+        )
+        return entry[0] if entry is not None else None
+
+    def put(self, digest: str, text: str, owner: str = None):
+        if len(text) > self.max_bytes:
+            return
+        with self._lock:
+            owners = set()
+            if digest in self._entries:
+                owners = self._entries[digest][2]
+                self._drop(digest)
+            if owner is not None:
+                owners.add(owner)
+            self._entries[digest] = (
+                text,
+                time.monotonic() + self.ttl_seconds,
+                owners,
+            )
+            self._size += len(text)
+            while self._size > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def add_owner(self, digest: str, owner: str):
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                entry[2].add(owner)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._size,
+            }
+
+
+text_cache = TextCache()
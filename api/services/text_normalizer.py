@@ -0,0 +1,105 @@
+import re
+from collections import Counter
+
+from api.services.chunking import estimate_tokens
+
+# pdf_extractor separates pages with a form feed, like pdftotext
+PAGE_BREAK = "\f"
+
+# only the first/last few lines of a page can be running headers/footers
+_EDGE_LINES = 3
+# a line is a header/footer if it repeats on this share of pages (min 3)
+_REPEAT_RATIO = 0.5
+
+_PAGE_NUMBER_RE = re.compile(
+    r"^\s*(?:page\s+)?[-–(\[]?\s*\d{1,4}\s*[-–)\]]?"
+    r"(?:\s*(?:of|/)\s*\d{1,4})?\s*$",
+    re.IGNORECASE,
+)
+_BOILERPLATE_RES = [
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"^\s*docusign envelope id:.*$",
+        r"^\s*\[?\s*(?:this page (?:is )?intentionally left blank|intentionally left blank)\s*\]?\s*$",
+        r"^\s*\[?\s*signature page follows\s*\]?\s*$",
+        r"^\s*\[?\s*remainder of (?:this )?page intentionally left blank\.?\s*\]?\s*$",
+        r"^\s*(?:strictly\s+)?(?:private\s*(?:&|and)\s*)?confidential\s*$",
+        r"^\s*printed on\b.*$",
+        r"^\s*https?://\S+\s*$",
+    )
+]
+_HYPHEN_BREAK_RE = re.compile(r"(\w)-\n[ \t]*([a-z])")
+_INLINE_SPACE_RE = re.compile(r"[ \t\u00a0\u2000-\u200b\u202f\u3000]+")
+_BLANK_RUN_RE = re.compile(r"\n{3,}")
+
+
+def _canonical(line: str) -> str:
+    # "Page 3 of 12" and "Page 4 of 12" are the same footer
+    return re.sub(r"\d+", "#", _INLINE_SPACE_RE.sub(" ", line).strip().lower())
+
+
+def _edge_indexes(lines: list) -> list:
+    content = [i for i, line in enumerate(lines) if line.strip()]
+    return sorted(set(content[:_EDGE_LINES] + content[-_EDGE_LINES:]))
+
+
+def _strip_running_lines(pages: list) -> list:
+    """Drop lines repeated at the top or bottom of most pages."""
+    if len(pages) < 3:
+        return pages
+    counts = Counter()
+    for lines in pages:
+        counts.update({_canonical(lines[i]) for i in _edge_indexes(lines)})
+    threshold = max(3, int(len(pages) * _REPEAT_RATIO))
+    running = {line for line, n in counts.items() if n >= threshold and line}
+
+    out = []
+    for lines in pages:
+        edges = set(_edge_indexes(lines))
+        out.append(
+            [
+                line
+                for i, line in enumerate(lines)
+                if i not in edges or _canonical(line) not in running
+            ]
+        )
+    return out
+
+
+def _is_boilerplate(line: str) -> bool:
+    return any(r.match(line) for r in _BOILERPLATE_RES)
+
+
+def normalize_contract_text(text: str):
+    """
+    Shrink extracted contract text before it is prompted: drops running
+    headers/footers and page numbers, rejoins words hyphenated across line
+    breaks, removes common boilerplate lines and collapses whitespace.
+    Line and paragraph breaks are kept for clause splitting.
+    Returns (normalized_text, stats).
+    """
+    text = text or ""
+    pages = [page.split("\n") for page in text.split(PAGE_BREAK)]
+    pages = _strip_running_lines(pages)
+
+    kept = []
+    for lines in pages:
+        edges = set(_edge_indexes(lines))
+        for i, line in enumerate(lines):
+            if i in edges and _PAGE_NUMBER_RE.match(line):
+                continue
+            if _is_boilerplate(line):
+                continue
+            kept.append(_INLINE_SPACE_RE.sub(" ", line).strip())
+
+    normalized = "\n".join(kept)
+    normalized = _HYPHEN_BREAK_RE.sub(r"\1\2", normalized)
+    normalized = _BLANK_RUN_RE.sub("\n\n", normalized).strip()
+
+    tokens_in = estimate_tokens(text)
+    tokens_out = estimate_tokens(normalized)
+    return normalized, {
+        "tokensIn": tokens_in,
+        "tokensOut": tokens_out,
+        "tokensSaved": tokens_in - tokens_out,
+    }
@@ -0,0 +1,198 @@
+import hashlib
+import io
+import mmap
+import os
+import tempfile
+from contextlib import contextmanager
+
+from flask import Request
+
+from api.config import Config
+
+_READ_CHUNK = 64 * 1024
+
+
+class UploadTooLarge(ValueError):
+    def __init__(self, limit: int):
+        super().__init__(f"File exceeds the {format_size(limit)} upload limit")
+        self.limit = limit
+
+
+def format_size(size: int) -> str:
+    for unit, scale in (("MB", 1024 * 1024), ("KB", 1024)):
+        if size >= scale:
+            return f"{round(size / scale, 1):g} {unit}"
+    return f"{size} bytes"
+
+
+class SpooledUpload:
+    """
+    An uploaded file written in chunks into memory, moving to a named temp
+    file once it passes max_memory bytes. UploadRequest makes Werkzeug's
+    multipart parser write file parts straight into one, so the upload is
+    stored once, while the body is read. The sha256 (text-cache handle) is
+    computed while writing, and on-disk files are parsed through mmap.
+    Past max_bytes the data is dropped and the upload marked overflowed;
+    spool_upload then raises UploadTooLarge for that file only.
+    """
+
+    def __init__(self, max_memory: int = None, max_bytes: int = None):
+        self.max_memory = (
+            max_memory if max_memory is not None else Config.UPLOAD_SPOOL_MAX_MEMORY
+        )
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.path = None  # set once spooled to disk
+        self.digest = None
+        self.overflowed = False
+        self._buffer = io.BytesIO()
+        self._file = None
+        self._hash = hashlib.sha256()
+
+    def write(self, chunk: bytes):
+        if self.overflowed:
+            return
+        if self.max_bytes is not None and self.size + len(chunk) > self.max_bytes:
+            # keep consuming the part, but store none of it
+            self.close()
+            self.overflowed = True
+            return
+        self._hash.update(chunk)
+        self.size += len(chunk)
+        if self._file is None and self.size > self.max_memory:
+            fd, self.path = tempfile.mkstemp(prefix="upload-")
+            self._file = os.fdopen(fd, "w+b")
+            self._file.write(self._buffer.getbuffer())
+            self._buffer = None
+        (self._file or self._buffer).write(chunk)
+
+    # file API Werkzeug's FileStorage expects from its stream
+    def _target(self):
+        return self._file or self._buffer or io.BytesIO()
+
+    def seek(self, offset: int, whence: int = 0):
+        return self._target().seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._target().tell()
+
+    def read(self, size: int = -1) -> bytes:
+        return self._target().read(size)
+
+    def readline(self, size: int = -1) -> bytes:
+        return self._target().readline(size)
+
+    def detach(self) -> "SpooledUpload":
+        """
+        Move the spooled data into a new SpooledUpload and leave this one
+        empty. Werkzeug closes request files when the request ends, and
+        background jobs keep using the upload after that.
+        """
+        other = SpooledUpload.__new__(SpooledUpload)
+        other.__dict__.update(self.__dict__)
+        self._file = self.path = None
+        self._buffer = io.BytesIO()
+        self.size = 0
+        return other
+
+    def finish(self, kind: str = ""):
+        # the text cache key: kind (the file extension) decides the parser
+        self._hash.update(kind.encode("utf-8"))
+        self.digest = self._hash.hexdigest()
+        if self._file is not None:
+            self._file.flush()
+        return self
+
+    @contextmanager
+    def open(self, mapped: bool = True):
+        """
+        Seekable binary reader: a read-only mmap once on disk, or with
+        mapped=False a regular file, for parsers that need the full file
+        API (zipfile, hence python-docx, calls seekable(), which mmap lacks).
+        """
+        if self._file is None:
+            self._buffer.seek(0)
+            yield self._buffer
+            return
+        if not mapped:
+            with open(self.path, "rb") as source:
+                yield source
+            return
+        if self.size == 0:
+            yield io.BytesIO()
+            return
+        view = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield view
+        finally:
+            view.close()
+
+    def decode(self, encoding: str = "utf-8") -> str:
+        # decodes straight from the buffer or mapping, without a bytes copy
+        with self.open() as source:
+            if isinstance(source, io.BytesIO):
+                with source.getbuffer() as view:
+                    return str(view, encoding)
+            return str(source, encoding)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+        self._buffer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def spool_upload(
+    file_storage, kind: str = "", max_bytes: int = None, max_memory: int = None
+) -> SpooledUpload:
+    """
+    The SpooledUpload behind a werkzeug FileStorage. Parts parsed by
+    UploadRequest are already spooled and size-checked and are taken over
+    without a copy; other streams are copied in chunks, enforcing
+    max_bytes while reading. Raises UploadTooLarge past max_bytes.
+    """
+    max_bytes = max_bytes or Config.MAX_UPLOAD_BYTES
+    stream = file_storage.stream
+    if isinstance(stream, SpooledUpload):
+        if stream.overflowed:
+            raise UploadTooLarge(stream.max_bytes)
+        return stream.detach().finish(kind)
+
+    upload = SpooledUpload(max_memory)
+    try:
+        while True:
+            chunk = stream.read(_READ_CHUNK)
+            if not chunk:
+                break
+            if upload.size + len(chunk) > max_bytes:
+                raise UploadTooLarge(max_bytes)
+            upload.write(chunk)
+    except BaseException:
+        upload.close()
+        raise
+    return upload.finish(kind)
+
+
+class UploadRequest(Request):
+    """
+    Request class whose multipart parser writes file parts into
+    SpooledUploads capped at MAX_UPLOAD_BYTES, instead of Werkzeug's own
+    temp files that spool_upload would then have to copy.
+    """
+
+    def _get_file_stream(
+        self, total_content_length, content_type, filename=None, content_length=None
+    ):
+        return SpooledUpload(max_bytes=Config.MAX_UPLOAD_BYTES)
@@ -1,15 +1,31 @@
 import datetime
+import time
 
-import bcrypt
 from bson.objectid import ObjectId
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import DuplicateKeyError
 
-from api.extensions import db
+from api.extensions import get_db
+from api.services.password_hasher import password_hasher
+from api.services.revocation_cache import revocation_cache
 
 
 class UserService:
     def __init__(self):
-        self.col = db["users"]
-        self.blacklist = db["token_blacklist"]
+        self.col = get_db()["users"]
+        self.blacklist = get_db()["token_blacklist"]
+
+    def ensure_indexes(self):
+        # expiresAt must be a BSON date for the TTL monitor to remove it
+        self.blacklist.create_index("expiresAt", expireAfterSeconds=0)
+        self.blacklist.create_index([("jti", ASCENDING)])
+        self.blacklist.create_index([("revokedAt", ASCENDING)])
+        # last: fails while older signup races have left duplicate emails,
+        # which must not cost the blocklist its indexes
+        try:
+            self.col.create_index([("email", ASCENDING)], unique=True)
+        except DuplicateKeyError as e:
+            print("Could not create unique email index (duplicate emails):", e)
 
     # ---------- CRUD ----------
     def create_user(
@@ -17,16 +33,20 @@ class UserService:
     ):
         if self.col.find_one({"email": email}):
             raise ValueError("Email already registered")
-        hashed = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
-        res = self.col.insert_one(
-            {
-                "first_name": first_name,
-                "last_name": last_name,
-                "email": email,
-                "password": hashed.decode("utf-8"),
-                "createdAt": datetime.datetime.utcnow().isoformat(),
-            }
-        )
+        hashed = password_hasher.hash(password)
+        try:
+            res = self.col.insert_one(
+                {
+                    "first_name": first_name,
+                    "last_name": last_name,
+                    "email": email,
+                    "password": hashed,
+                    "createdAt": datetime.datetime.utcnow().isoformat(),
+                }
+            )
+        except DuplicateKeyError:
+            # lost a signup race against the unique email index
+            raise ValueError("Email already registered")
         return str(res.inserted_id)
 
     def get_by_email(self, email: str):
@@ -44,12 +64,20 @@ class UserService:
 
     # ---------- Password ----------
     def verify_password(self, password_plain: str, hashed: str) -> bool:
-        try:
-            return bcrypt.checkpw(
-                password_plain.encode("utf-8"), hashed.encode("utf-8")
-            )
-        except Exception:
+        return password_hasher.verify(password_plain, hashed)
+
+    def upgrade_password_hash(self, user_id: str, password_plain: str, hashed: str):
+        """
+        Re-hash a verified password when its cost differs from BCRYPT_ROUNDS.
+        """
+        if not password_hasher.needs_rehash(hashed):
             return False
+        new_hash = password_hasher.hash(password_plain)
+        self.col.update_one(
+            {"_id": ObjectId(user_id), "password": hashed},
+            {"$set": {"password": new_hash}},
+        )
+        return True
 
     # ---------- Token blacklist ----------
     def revoke_token(self, jti: str, token_type: str, expires_at_ts: int = None):
@@ -59,8 +87,46 @@ class UserService:
             "revokedAt": datetime.datetime.utcnow().isoformat(),
         }
         if expires_at_ts:
-            doc["expiresAt"] = expires_at_ts
+            doc["expiresAt"] = datetime.datetime.utcfromtimestamp(expires_at_ts)
         self.blacklist.insert_one(doc)
+        revocation_cache.add(jti, expires_at_ts)
 
     def is_token_revoked(self, jti: str) -> bool:
-        return bool(self.blacklist.find_one({"jti": jti}))
+        return revocation_cache.is_revoked(jti)
+
+    def migrate_blacklist_expiry(self, batch_size: int = 500):
+        """
+        Blacklist entries saved with a numeric expiresAt (epoch seconds)
+        are never removed by the TTL index. Deletes the ones already
+        expired and converts the rest to dates. A one-off migration
+        (api.scripts.migrate_token_blacklist). Returns (deleted, converted).
+        """
+        numeric = {"expiresAt": {"$type": "number"}}
+        now_ts = time.time()
+        deleted = self.blacklist.delete_many(
+            {"expiresAt": {"$type": "number", "$lt": now_ts}}
+        ).deleted_count
+        converted = 0
+        while True:
+            docs = list(
+                self.blacklist.find(numeric, {"expiresAt": 1}).limit(batch_size)
+            )
+            if not docs:
+                return deleted, converted
+            self.blacklist.bulk_write(
+                [
+                    UpdateOne(
+                        {"_id": doc["_id"]},
+                        {
+                            "$set": {
+                                "expiresAt": datetime.datetime.utcfromtimestamp(
+                                    doc["expiresAt"]
+                                )
+                            }
+                        },
+                    )
+                    for doc in docs
+                ],
+                ordered=False,
+            )
+            converted += len(docs)
@@ -1,5 +1,67 @@
 import re
 
+_ROOT_OPEN_RE = re.compile(r"<summary", flags=re.IGNORECASE)
+_TAG_PATTERNS = {}  # (name, is_close) -> compiled literal tag pattern
+
+
+def _tag(name: str, close: bool = False):
+    key = (name, close)
+    pattern = _TAG_PATTERNS.get(key)
+    if pattern is None:
+        tag = f"</{name}>" if close else f"<{name}>"
+        pattern = _TAG_PATTERNS[key] = re.compile(re.escape(tag), re.IGNORECASE)
+    return pattern
+
+
+class _TagIndex:
+    """
+    Tag lookups that mirror the non-greedy regexes of parse_summary_regex,
+    resolved lazily with searches bounded to the enclosing element. Each
+    lookup scans only text[lo:hi] once, and a missing close tag ends a
+    find_all instead of being searched for again, so malformed or
+    adversarial input stays linear without indexing every tag up front.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def has_root(self) -> bool:
+        # same condition as <summary[\s\S]*?>[\s\S]*</summary>
+        root = _ROOT_OPEN_RE.search(self.text)
+        if root is None:
+            return False
+        gt = self.text.find(">", root.end())
+        return gt >= 0 and _tag("summary", True).search(self.text, gt + 1) is not None
+
+    def first(self, name: str, lo: int = 0, hi: int = None):
+        """
+        (content_start, content_end, close_end) of the first <name>...</name>
+        lying entirely inside text[lo:hi], or None.
+        """
+        hi = len(self.text) if hi is None else hi
+        opened = _tag(name).search(self.text, lo, hi)
+        if opened is None:
+            return None
+        closed = _tag(name, True).search(self.text, opened.end(), hi)
+        if closed is None:
+            return None
+        return opened.end(), closed.start(), closed.end()
+
+    def find_all(self, name: str, lo: int = 0, hi: int = None) -> list:
+        out = []
+        while True:
+            span = self.first(name, lo, hi)
+            if span is None:
+                return out
+            out.append(span)
+            lo = span[2]
+
+    def value(self, name: str, lo: int = 0, hi: int = None):
+        span = self.first(name, lo, hi)
+        if span is None:
+            return None
+        return self.text[span[0] : span[1]].strip()
+
 
 class XMLParser:
     def __init__(self):
@@ -13,7 +75,74 @@ class XMLParser:
             return None
         return m.group(1).strip()
 
+    def _parse_risk(self, rb: str):
+        rid = self._extract_first(r"<id>(.*?)</id>", rb, required=False)
+        rtitle = self._extract_first(r"<title>(.*?)</title>", rb, required=False)
+        rdesc = self._extract_first(
+            r"<description>(.*?)</description>", rb, required=False
+        )
+        rsev = self._extract_first(r"<severity>(.*?)</severity>", rb, required=False)
+        risk_obj = {
+            "id": rid if rid else None,
+            "title": rtitle if rtitle else None,
+            "description": rdesc if rdesc else None,
+            "severity": rsev if rsev else None,
+        }
+        if any(v for v in risk_obj.values()):
+            return risk_obj
+        return None
+
     def parse_summary(self, xml_text: str) -> dict:
+        """
+        Linear-time engine: every element is found with searches bounded
+        to its enclosing element (see _TagIndex). Output is identical to
+        parse_summary_regex, and it is also faster on well-formed input.
+        """
+        idx = _TagIndex(xml_text)
+        if not idx.has_root():
+            raise ValueError("Missing <summary> root")
+
+        title = idx.value("title") or ""
+
+        def items(block_name, item_name):
+            block = idx.first(block_name)
+            if block is None:
+                return []
+            return [
+                xml_text[a:b].strip()
+                for a, b, _ in idx.find_all(item_name, block[0], block[1])
+            ]
+
+        key_obligations = items("keyobligations", "obligation")
+        rights = items("rights", "right")
+        suggested_edits = items("suggestededits", "edit")
+
+        risks = []
+        risks_block = idx.first("risks")
+        if risks_block is not None:
+            for a, b, _ in idx.find_all("risk", risks_block[0], risks_block[1]):
+                risk_obj = {
+                    "id": idx.value("id", a, b) or None,
+                    "title": idx.value("title", a, b) or None,
+                    "description": idx.value("description", a, b) or None,
+                    "severity": idx.value("severity", a, b) or None,
+                }
+                if any(v for v in risk_obj.values()):
+                    risks.append(risk_obj)
+
+        return {
+            "title": title,
+            "keyObligations": key_obligations,
+            "risks": risks,
+            "suggestedEdits": suggested_edits,
+            "rights": rights,
+        }
+
+    def parse_summary_regex(self, xml_text: str) -> dict:
+        """
+        Original multi-regex implementation, kept as the reference for
+        api.scripts.bench_xml_parser.
+        """
         if not re.search(
             r"<summary[\s\S]*?>[\s\S]*</summary>", xml_text, flags=re.IGNORECASE
         ):
@@ -66,21 +195,8 @@ class XMLParser:
         )
         risks = []
         for rb in risk_blocks:
-            rid = self._extract_first(r"<id>(.*?)</id>", rb, required=False)
-            rtitle = self._extract_first(r"<title>(.*?)</title>", rb, required=False)
-            rdesc = self._extract_first(
-                r"<description>(.*?)</description>", rb, required=False
-            )
-            rsev = self._extract_first(
-                r"<severity>(.*?)</severity>", rb, required=False
-            )
-            risk_obj = {
-                "id": rid if rid else None,
-                "title": rtitle if rtitle else None,
-                "description": rdesc if rdesc else None,
-                "severity": rsev if rsev else None,
-            }
-            if any(v for v in risk_obj.values()):
+            risk_obj = self._parse_risk(rb)
+            if risk_obj:
                 risks.append(risk_obj)
 
         return {
@@ -90,3 +206,48 @@ class XMLParser:
             "suggestedEdits": suggested_edits,
             "rights": rights,
         }
+
+
+class IncrementalXMLParser:
+    """
+    Feed streamed XML text in arbitrary pieces; each <risk>, <obligation>,
+    <right> and <edit> is returned as an event once its closing tag arrives.
+    close() parses the full document with XMLParser.parse_summary.
+    """
+
+    _ELEMENT_RE = re.compile(
+        r"<(risk|obligation|right|edit)>(.*?)</\1>", flags=re.DOTALL | re.IGNORECASE
+    )
+
+    def __init__(self):
+        self.parser = XMLParser()
+        self._parts = []
+        self._tail = ""
+
+    def feed(self, chunk: str) -> list:
+        if not chunk:
+            return []
+        self._parts.append(chunk)
+        self._tail += chunk
+        events = []
+        pos = 0
+        for m in self._ELEMENT_RE.finditer(self._tail):
+            kind = m.group(1).lower()
+            if kind == "risk":
+                value = self.parser._parse_risk(m.group(2))
+                if value is None:
+                    pos = m.end()
+                    continue
+            else:
+                value = m.group(2).strip()
+            events.append((kind, value))
+            pos = m.end()
+        # keep only the unfinished remainder for the next scan
+        self._tail = self._tail[pos:]
+        return events
+
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def close(self) -> dict:
+        return self.parser.parse_summary(self.text())